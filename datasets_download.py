@@ -1,5 +1,5 @@
 from datasets import load_dataset
-import pickle
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 
 os.makedirs('src/data', exist_ok=True)
@@ -11,11 +11,22 @@ datasets = {
     "openorca": "Open-Orca/OpenOrca"
 }
 
-for name, path in datasets.items():
+def download_and_save(name, path):
     print(f"Downloading {name} dataset...")
-    dataset = load_dataset(path)
-    with open(f'src/data/{name}_dataset.pkl', 'wb') as f:
-        pickle.dump(dataset, f)
+    dataset = load_dataset(path, num_proc=os.cpu_count())
+    # Arrow on disk: readers load_from_disk() and memory-map instead of
+    # unpickling the whole dataset into Python objects.
+    dataset.save_to_disk(f'src/data/{name}_dataset')
     print(f"Saved {name} dataset")
 
-print("All datasets downloaded and saved.")
\ No newline at end of file
+with ThreadPoolExecutor(max_workers=4) as executor:
+    futures = {}
+    for name, path in datasets.items():
+        if os.path.exists(f'src/data/{name}_dataset'):
+            print(f"Skipping {name} dataset (already downloaded)")
+            continue
+        futures[executor.submit(download_and_save, name, path)] = name
+    for future in as_completed(futures):
+        future.result()
+
+print("All datasets downloaded and saved.")
@@ -1,9 +1,13 @@
-from attrs import define
+from attrs import frozen
 
 
-@define(kw_only=True)
+@frozen(kw_only=True)
 class ResPiece:
     index: int
     role: str | None = None
     content: str | None = None
     stop: str | None = None
+
+
+class RateLimited(Exception):
+    """Raised on HTTP 429 so orchestrators can back off explicitly."""
@@ -1,5 +1,6 @@
 from typing import Callable, List, Dict
 from .api_protocol import ResPiece
+import asyncio
 import logging
 import importlib
 
@@ -15,13 +16,23 @@ endpoint_to_module: Dict[str, str] = {
     "triton": ".triton",
 }
 
+# Resolved callables, keyed by endpoint type, so importlib only runs once
+# per endpoint instead of on every request.
+_streaming_cache: Dict[str, Callable] = {}
+_inference_cache: Dict[str, Callable] = {}
+
 def get_streaming_inference(endpoint_type: str,) -> Callable:
+    fn = _streaming_cache.get(endpoint_type)
+    if fn is not None:
+        return fn
     module_name = endpoint_to_module.get(endpoint_type)
     if not module_name:
         raise NotImplementedError(f"Endpoint '{endpoint_type}' is not implemented.")
     try:
         module = importlib.import_module(module_name, package=__package__)
-        return getattr(module, "streaming_inference")
+        fn = getattr(module, "streaming_inference")
+        _streaming_cache[endpoint_type] = fn
+        return fn
     except (ImportError, AttributeError) as e:
         logger.error(f"Error loading streaming_inference() for endpoint {endpoint_type}: {e}")
         raise
@@ -33,13 +44,72 @@ async def get_friendliai_streaming_inference():
     from .friendliai import streaming_inference
     return streaming_inference
 
+async def stream_many(
+    endpoint_type: str,
+    dialogs: List[List[Dict[str, str]]],
+    *,
+    max_concurrency: int = 64,
+    **kwargs,
+):
+    """
+    Fan out streaming inference over many dialogs with bounded concurrency.
+
+    Yields (dialog_index, ResPiece) tuples as pieces arrive. The semaphore
+    caps in-flight requests so fan-out cannot blow past the shared
+    connector limits and cascade into connection errors.
+    """
+    streaming_func = get_streaming_inference(endpoint_type)
+    sem = asyncio.Semaphore(max_concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def _one(idx, dialog):
+        async with sem:
+            try:
+                # The endpoint functions pop from kwargs, so hand each
+                # stream its own copy.
+                async for piece in streaming_func(dialog, **dict(kwargs)):
+                    await queue.put((idx, piece))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Hand the failure to the consumer instead of letting the
+                # cleanup gather swallow it -- a failed dialog must not
+                # look like a short successful stream.
+                await queue.put((idx, e))
+                return
+            await queue.put((idx, done))
+
+    tasks = [asyncio.create_task(_one(i, d)) for i, d in enumerate(dialogs)]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            idx, item = await queue.get()
+            if item is done:
+                remaining -= 1
+                continue
+            if isinstance(item, Exception):
+                # Fail fast like a TaskGroup would: the finally block
+                # cancels the sibling streams.
+                raise item
+            yield idx, item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
 def get_inference(endpoint_type: str,) -> Callable:
+    fn = _inference_cache.get(endpoint_type)
+    if fn is not None:
+        return fn
     module_name = endpoint_to_module.get(endpoint_type)
     if not module_name:
         raise NotImplementedError(f"Endpoint '{endpoint_type}' is not implemented.")
     try:
         module = importlib.import_module(module_name, package=__package__)
-        return getattr(module, "inference")
+        fn = getattr(module, "inference")
+        _inference_cache[endpoint_type] = fn
+        return fn
     except (ImportError, AttributeError) as e:
         logger.error(f"Error loading inference() for endpoint {endpoint_type}: {e}")
         raise
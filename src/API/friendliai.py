@@ -1,13 +1,98 @@
-import json
+import orjson
+from functools import lru_cache
 from typing import List, Dict
 from .api_protocol import ResPiece
 import logging
-import aiohttp
-from .utils import prepare_inference_payload, handle_inference_response
+from .utils import (
+    format_dialog,
+    prepare_inference_payload,
+    serialize_payload,
+    handle_inference_response,
+    get_session,
+    get_sync_session,
+    get_async_client,
+    TokenCoalescer,
+)
 
 logger = logging.getLogger("friendliai")
 logger.setLevel(logging.WARNING)
 
+async def _stream_sse(url, headers, data, legacy, coalesce):
+    """POST pre-serialized `data` and yield ResPieces parsed from the SSE response."""
+    session = await get_session()
+    async with session.post(url, data=data, headers=headers) as response:
+        if response.status == 429:
+            raise Exception('Rate limit exceeded, consider backing off')
+        coalescer = TokenCoalescer() if coalesce else None
+        stream = response.content
+        # LOAD_FAST instead of LOAD_GLOBAL on every yielded token.
+        res_piece = ResPiece
+        async for raw in stream:
+            # Frame in bytes: no decode/strip/split on the per-token path.
+            if not raw.startswith(b'data:'):
+                continue
+            data = raw[5:].strip()
+            if data == b'[DONE]':
+                break
+            try:
+                json_data = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                logger.error(f"Failed to parse JSON: {raw!r}")
+                continue
+            if legacy:
+                if "event" in json_data and json_data["event"] == "token_sampled":
+                    if coalescer is None:
+                        yield res_piece(
+                            index=json_data["index"],
+                            role=None,
+                            content=json_data["text"],
+                            stop=json_data.get("finish_reason", None),
+                        )
+                    else:
+                        coalescer.add(
+                            json_data["index"],
+                            None,
+                            json_data["text"],
+                            json_data.get("finish_reason", None),
+                        )
+            else:
+                for choice in json_data["choices"]:
+                    delta = choice["delta"]
+                    if coalescer is None:
+                        yield res_piece(
+                            index=choice["index"],
+                            role=delta.get("role"),
+                            content=delta.get("content", ""),
+                            stop=choice.get("finish_reason", None),
+                        )
+                    else:
+                        coalescer.add(
+                            choice["index"],
+                            delta.get("role"),
+                            delta.get("content", ""),
+                            choice.get("finish_reason", None),
+                        )
+            # Flush once the reader's buffer is drained: anything merged
+            # so far arrived in the same read, so timing is preserved.
+            if coalescer is not None and not stream._buffer:
+                for piece in coalescer.flush():
+                    yield piece
+        if coalescer is not None:
+            for piece in coalescer.flush():
+                yield piece
+
+@lru_cache(maxsize=128)
+def _build_urls_headers(api_base, api_key, legacy, accept):
+    # Cached per (endpoint, api_key): the Bearer f-string and header dict
+    # are built once, not per request. Callers must not mutate the dict.
+    url = f"{api_base}/completions" if legacy else f"{api_base}/chat/completions"
+    headers = {
+        "accept": accept,
+        "content-type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    return url, headers
+
 async def streaming_inference(
     dialog: List[Dict[str, str]],
     **kwargs,
@@ -17,72 +102,84 @@ async def streaming_inference(
         api_base = kwargs.pop("api_base")
         api_key = kwargs.pop("api_key", None)
         legacy = kwargs.pop('legacy', False)
+        coalesce = kwargs.pop('coalesce', True)
         kwargs.pop("stream", None)
-        
-        url = f"{api_base}/completions" if legacy else f"{api_base}/chat/completions"
-        headers = {
-            "accept": "text/event-stream",
-            "content-type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        }
-        
-        payload = prepare_inference_payload(dialog, kwargs.pop("model"), True, legacy, **kwargs)
-            
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status == 429:
-                    raise Exception('Rate limit exceeded, consider backing off')
-                async for chunk in response.content:
-                    s = chunk.decode().strip()
-                    if s.startswith('data:'):
-                        data = s.split(':', 1)[1].strip()
-                        if data == '[DONE]':
-                            break
-                        try:
-                            json_data = json.loads(data)
-                            if legacy:
-                                if "event" in json_data and json_data["event"] == "token_sampled":
-                                    yield ResPiece(
-                                        index=json_data["index"],
-                                        role=None,
-                                        content=json_data["text"],
-                                        stop=json_data.get("finish_reason", None),
-                                    )
-                            else:
-                                for choice in json_data["choices"]:
-                                    yield ResPiece(
-                                        index=choice["index"],
-                                        role=choice["delta"].get("role"),
-                                        content=choice["delta"].get("content", ""),
-                                        stop=choice.get("finish_reason", None),
-                                    )
-                        except json.JSONDecodeError:
-                           logger.error(f"Failed to parse JSON: {s}")
+
+        url, headers = _build_urls_headers(api_base, api_key, legacy, "text/event-stream")
+        data = serialize_payload(dialog, kwargs.pop("model"), True, legacy, **kwargs)
+
+        async for piece in _stream_sse(url, headers, data, legacy, coalesce):
+            yield piece
     except Exception as e:
         yield e
 
+def make_streaming_caller(
+    api_base: str,
+    api_key: str | None,
+    model: str,
+    legacy: bool = False,
+    coalesce: bool = True,
+    **defaults,
+):
+    """Specialize streaming_inference for a fixed endpoint configuration.
+
+    The URL, headers (including the Bearer token), and payload skeleton are
+    computed once here, so the returned caller does no kwargs.pop() churn or
+    header construction per request — only the dialog (and any per-call
+    overrides) vary.
+    """
+    url, headers = _build_urls_headers(api_base, api_key, legacy, "text/event-stream")
+    base_payload = {"model": model, "stream": True, **defaults}
+
+    async def caller(dialog: List[Dict[str, str]], **kwargs):
+        payload = {**base_payload, **kwargs} if kwargs else dict(base_payload)
+        if legacy:
+            payload["prompt"] = format_dialog(dialog, legacy=True)
+        else:
+            payload["messages"] = dialog
+        try:
+            async for piece in _stream_sse(url, headers, orjson.dumps(payload), legacy, coalesce):
+                yield piece
+        except Exception as e:
+            yield e
+
+    return caller
+
+async def ainference(
+    dialog: List[Dict[str, str]],
+    **kwargs,
+) -> List[Dict[str, str]]:
+    """Async variant of inference(); N calls can be fanned out with
+    asyncio.gather over the shared HTTP/2 client without threads."""
+    api_base = kwargs.pop("api_base")
+    api_key = kwargs.pop("api_key", None)
+    legacy = kwargs.pop('legacy', False)
+    kwargs.pop("stream", None)
+
+    url, headers = _build_urls_headers(api_base, api_key, legacy, "application/json")
+
+    payload = prepare_inference_payload(dialog, kwargs.pop("model"), False, legacy, **kwargs)
+
+    response = await get_async_client().post(url, json=payload, headers=headers)
+    response.raise_for_status()
+
+    return handle_inference_response(response.json(), legacy)
+
 def inference(
     dialog: List[Dict[str, str]],
     **kwargs,
 ) -> List[Dict[str, str]]:
-    import requests
-    
     api_base = kwargs.pop("api_base")
     api_key = kwargs.pop("api_key", None)
     legacy = kwargs.pop('legacy', False)
     kwargs.pop("stream", None)
-    
-    url = f"{api_base}/completions" if legacy else f"{api_base}/chat/completions"
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    
+
+    url, headers = _build_urls_headers(api_base, api_key, legacy, "application/json")
+
     payload = prepare_inference_payload(dialog, kwargs.pop("model"), False, legacy, **kwargs)
 
-    response = requests.post(url, json=payload, headers=headers)
+    response = get_sync_session().post(url, json=payload, headers=headers, timeout=(5, 60))
     response.raise_for_status()
     json_data = response.json()
 
-    return handle_inference_response(json_data, legacy)
\ No newline at end of file
+    return handle_inference_response(json_data, legacy)
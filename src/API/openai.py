@@ -31,11 +31,17 @@ async def streaming_inference(
             async for chunk in await openai.ChatCompletion.acreate(**payload):
                 if "choices" in chunk:
                     for choice in chunk.choices:
+                        delta = choice.delta
+                        role = delta.get("role")
+                        content = delta.get("content")
+                        stop = choice.finish_reason
+                        if role is None and content is None and stop is None:
+                            continue
                         yield ResPiece(
                             index=choice.index,
-                            role=choice.delta.get("role"),
-                            content=choice.delta.get("content"),
-                            stop=choice.finish_reason,
+                            role=role,
+                            content=content,
+                            stop=stop,
                         )
 
     except openai.error.OpenAIError as e:
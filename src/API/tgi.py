@@ -1,57 +1,98 @@
-import openai
+import orjson
 from typing import List, Dict
-from .api_protocol import ResPiece
+from .api_protocol import ResPiece, RateLimited
 import logging
-from .utils import prepare_inference_payload, handle_inference_response
+from .utils import (
+    prepare_inference_payload,
+    serialize_payload,
+    handle_inference_response,
+    get_session,
+    get_sync_session,
+)
 
 logger = logging.getLogger("tgi")
 logger.setLevel(logging.WARNING)
 
+def _build_url_headers(api_base, api_key, legacy, accept):
+    url = f"{api_base}/completions" if legacy else f"{api_base}/chat/completions"
+    headers = {
+        "accept": accept,
+        "content-type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    return url, headers
+
 async def streaming_inference(
     dialog: List[Dict[str, str]],
     **kwargs,
 ):
-    try:
-        openai.api_base = kwargs.pop("api_base")
-        openai.api_key = kwargs.pop("api_key", "EMPTY")
-        legacy = kwargs.pop('legacy', False)
-        kwargs.pop("stream", None)
-        
-        payload = prepare_inference_payload(dialog, kwargs.pop("model"), True, legacy, **kwargs)
-        
-        completion = await (openai.Completion.acreate(**payload) if legacy 
-                            else openai.ChatCompletion.acreate(**payload))
-        
-        async for chunk in completion:
-            if "choices" in chunk:
-                for choice in chunk.choices:
-                    yield ResPiece(
-                        index=choice.index,
-                        role=None if legacy else choice.delta.get("role"),
-                        content=choice.text if legacy else choice.delta.get("content"),
-                        stop=choice.finish_reason,
-                    )
-                    
-    except openai.error.OpenAIError as e:
-        logger.error(f"OpenAI API error: {e}")
-        yield e
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        yield e
+    """Stream completions from TGI's OpenAI-compatible endpoint.
+
+    POSTs directly through the shared aiohttp session; the openai/httpx
+    client it replaces collapses under high request concurrency.
+
+    Yields ResPiece only; errors propagate as exceptions (RateLimited on
+    429) so consumers don't have to isinstance-check every chunk.
+    """
+    api_base = kwargs.pop("api_base")
+    api_key = kwargs.pop("api_key", "EMPTY")
+    legacy = kwargs.pop('legacy', False)
+    kwargs.pop("stream", None)
+
+    url, headers = _build_url_headers(api_base, api_key, legacy, "text/event-stream")
+    # Pre-serialized (and cached for repeated prompts): skips aiohttp's
+    # stdlib json.dumps plus the extra str-to-bytes pass.
+    data_bytes = serialize_payload(dialog, kwargs.pop("model"), True, legacy, **kwargs)
+
+    session = await get_session()
+    async with session.post(url, data=data_bytes, headers=headers) as response:
+        if response.status == 429:
+            raise RateLimited('Rate limit exceeded, consider backing off')
+        response.raise_for_status()
+        async for raw in response.content:
+            if not raw.startswith(b'data:'):
+                continue
+            data = raw[5:].strip()
+            if data == b'[DONE]':
+                break
+            if not data:
+                continue
+            try:
+                json_data = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                logger.error(f"Failed to parse JSON: {raw!r}")
+                continue
+            for choice in json_data["choices"]:
+                if legacy:
+                    role, content = None, choice.get("text")
+                else:
+                    delta = choice["delta"]
+                    role = delta.get("role")
+                    content = delta.get("content")
+                stop = choice.get("finish_reason", None)
+                if role is None and content is None and stop is None:
+                    continue
+                yield ResPiece(
+                    index=choice["index"],
+                    role=role,
+                    content=content,
+                    stop=stop,
+                )
 
 
 def inference(
     dialog: List[Dict[str, str]],
     **kwargs,
 ) -> List[Dict[str, str]]:
-    openai.api_base = kwargs.pop("api_base")
-    openai.api_key = kwargs.pop("api_key", "EMPTY")
+    api_base = kwargs.pop("api_base")
+    api_key = kwargs.pop("api_key", "EMPTY")
     legacy = kwargs.pop('legacy', False)
     kwargs.pop("stream", None)
-    
+
+    url, headers = _build_url_headers(api_base, api_key, legacy, "application/json")
     payload = prepare_inference_payload(dialog, kwargs.pop("model"), False, legacy, **kwargs)
-    
-    completion = (openai.Completion.create(**payload) if legacy 
-                  else openai.ChatCompletion.create(**payload))
-    
-    return handle_inference_response(completion, legacy)
\ No newline at end of file
+
+    response = get_sync_session().post(url, json=payload, headers=headers, timeout=(5, 60))
+    response.raise_for_status()
+
+    return handle_inference_response(response.json(), legacy)
@@ -1,11 +1,21 @@
-import requests
-import json
+import orjson
 
+from functools import lru_cache
 from typing import List, Dict
 from .api_protocol import ResPiece
 import logging
 
-import aiohttp
+from .utils import get_session, get_sync_session, get_async_client, TokenCoalescer
+
+
+@lru_cache(maxsize=32)
+def _headers_for(api_key: str) -> Dict[str, str]:
+    # One header dict per api_key; callers must not mutate it.
+    return {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
 
 
 async def streaming_inference(
@@ -15,6 +25,7 @@ async def streaming_inference(
     try:
         if "stream" in kwargs:
             kwargs.pop("stream")
+        coalesce = kwargs.pop("coalesce", True)
         url = "https://api.together.xyz/v1/chat/completions"
         payload = {
             "stop": ["</s>", "[/INST]"],
@@ -24,39 +35,74 @@ async def streaming_inference(
             "messages": dialog,
             **kwargs,
         }
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "Authorization": f"Bearer {kwargs['api_key']}",
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                async for chunk in response.content:
-                    if chunk == b"\n":
-                        continue
-                    s = chunk.decode()[6:]
-                    if s == "[DONE]\n":
-                        break
-                    try:
-                        json.loads(s)
-                    except:
-                        print(s)
-                    for choice in json.loads(s)["choices"]:
-                        role, content = None, None
-                        if "role" in choice["delta"]:
-                            role = choice["delta"]["role"]
-                        if "content" in choice["delta"]:
-                            content = choice["delta"]["content"]
+        headers = _headers_for(kwargs["api_key"])
+        session = await get_session()
+        async with session.post(url, json=payload, headers=headers) as response:
+            coalescer = TokenCoalescer() if coalesce else None
+            stream = response.content
+            async for chunk in stream:
+                # Keepalive pings and blank lines don't carry the prefix, so
+                # this also stops them from being mis-sliced into "".
+                if not chunk.startswith(b"data: "):
+                    continue
+                data = chunk[6:].rstrip()
+                if data == b"[DONE]":
+                    break
+                if not data:
+                    continue
+                try:
+                    json_data = orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    print(data)
+                    continue
+                for choice in json_data["choices"]:
+                    delta = choice["delta"]
+                    role = delta.get("role")
+                    content = delta.get("content")
+                    if coalescer is None:
                         yield ResPiece(
                             index=choice["index"],
                             role=role,
                             content=content,
                             stop=choice.get("finish_reason", None),
                         )
+                    else:
+                        coalescer.add(
+                            choice["index"],
+                            role,
+                            content,
+                            choice.get("finish_reason", None),
+                        )
+                if coalescer is not None and not stream._buffer:
+                    for piece in coalescer.flush():
+                        yield piece
+            if coalescer is not None:
+                for piece in coalescer.flush():
+                    yield piece
     except Exception as e:
         yield e
 
 
+async def ainference(
+    dialog: List[Dict[str, str]],
+    **kwargs,
+) -> str:
+    """Async variant of inference(); N calls can be fanned out with
+    asyncio.gather over the shared HTTP/2 client without threads."""
+    url = "https://api.together.xyz/v1/chat/completions"
+    payload = {
+        "stop": ["</s>", "[/INST]"],
+        "top_k": 50,
+        "repetition_penalty": 1,
+        "stream": False,
+        "messages": dialog,
+        **kwargs,
+    }
+    headers = _headers_for(kwargs["api_key"])
+    response = await get_async_client().post(url, json=payload, headers=headers)
+    return response.text
+
+
 def inference(
     dialog: List[Dict[str, str]],
     **kwargs,
@@ -70,19 +116,17 @@ def inference(
         "messages": dialog,
         **kwargs,
     }
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "Authorization": f"Bearer {kwargs['api_key']}",
-    }
-    response = requests.post(url, json=payload, headers=headers)
+    headers = _headers_for(kwargs["api_key"])
+    response = get_sync_session().post(url, json=payload, headers=headers, timeout=(5, 60))
     return response.text
 
 
 if __name__ == "__main__":
     import asyncio
+    import time
     from rich.live import Live
     from rich.table import Table
+    from rich.text import Text
     from rich import box
 
     conf = {
@@ -95,20 +139,19 @@ if __name__ == "__main__":
     # exit()
     n = 1 if "n" not in conf else conf["n"]
 
-    def create_table(dlist):
-        """Create a table with two columns, populated with data1 and data2."""
-        table = Table(box=box.SIMPLE)
-        for i in range(n):
-            table.add_column(f"Stream {i}")
-        table.add_row(*dlist)
-        return table
-
     async def main():
         streaming = streaming_inference(
             dialog=[{"role": "user", "content": "Can you tell me a joke?"}], **conf
         )
-        data_columns = [""] * n
-        with Live(auto_refresh=True) as live:
+        # Build the table once and mutate its Text cells in place; rebuilding
+        # a Table per token makes Rich re-measure every column each time.
+        cells = [Text() for _ in range(n)]
+        table = Table(box=box.SIMPLE)
+        for i in range(n):
+            table.add_column(f"Stream {i}")
+        table.add_row(*cells)
+        last_refresh = 0.0
+        with Live(table, auto_refresh=False) as live:
             async for ctx in streaming:
                 if isinstance(ctx, Exception):
                     raise ctx
@@ -119,7 +162,11 @@ if __name__ == "__main__":
                     s += ctx.content
                 if ctx.stop is not None:
                     s += " <" + ctx.stop + ">"
-                data_columns[ctx.index] = data_columns[ctx.index] + s
-                live.update(create_table(data_columns))
+                cells[ctx.index].append(s)
+                now = time.monotonic()
+                if now - last_refresh >= 0.016:
+                    live.refresh()
+                    last_refresh = now
+            live.refresh()
 
     asyncio.run(main())
@@ -1,9 +1,8 @@
-import json
 import logging
 from typing import List, Dict, Any
-import aiohttp
-import asyncio
-from .api_protocol import ResPiece
+import orjson
+from .api_protocol import ResPiece, RateLimited
+from .utils import get_session
 import tritonclient.http as httpclient
 
 logger = logging.getLogger("triton")
@@ -28,35 +27,32 @@ async def streaming_inference(
     dialog: List[Dict[str, str]],
     **kwargs,
 ):
-    try:
-        url = kwargs.pop("api_base")
-        model_name = kwargs.pop("model")
-        kwargs.pop("stream", None)
+    """Yields ResPiece only; errors propagate as exceptions (RateLimited
+    on 429) instead of being yielded into the stream."""
+    url = kwargs.pop("api_base")
+    model_name = kwargs.pop("model")
+    kwargs.pop("stream", None)
 
-        triton_input = prepare_triton_input(dialog, **kwargs)
+    triton_input = prepare_triton_input(dialog, **kwargs)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{url}/v2/models/{model_name}/infer", json=triton_input) as response:
-                if response.status != 200:
-                    raise Exception(f"Triton inference failed with status {response.status}")
-                
-                result = await response.json()
-                
-                # Parse the Triton response
-                output = result["outputs"][0]["data"][0]
-                decoded_output = output.encode('utf-8').decode('utf-8')
-                
-                # Yield the response as a ResPiece
-                yield ResPiece(
-                    index=0,
-                    role="assistant",
-                    content=decoded_output,
-                    stop=None
-                )
+    session = await get_session()
+    async with session.post(f"{url}/v2/models/{model_name}/infer", json=triton_input) as response:
+        if response.status == 429:
+            raise RateLimited('Rate limit exceeded, consider backing off')
+        response.raise_for_status()
 
-    except Exception as e:
-        logger.error(f"Error in Triton streaming inference: {str(e)}")
-        yield e
+        result = orjson.loads(await response.read())
+
+        # Parse the Triton response; the JSON field is already a str.
+        output = result["outputs"][0]["data"][0]
+
+        # Yield the response as a ResPiece
+        yield ResPiece(
+            index=0,
+            role="assistant",
+            content=output,
+            stop=None
+        )
 
 def inference(
     dialog: List[Dict[str, str]],
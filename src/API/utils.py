@@ -1,20 +1,156 @@
+import asyncio
 import logging
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+import aiohttp
+import orjson
+
+from .api_protocol import ResPiece, RateLimited
 
 logger = logging.getLogger("api_utils")
 
+class TokenCoalescer:
+    """Accumulate per-index token deltas and flush them as single ResPieces.
+
+    Deltas read from the same network buffer arrived together, so merging
+    them loses no timing information while cutting generator resumes and
+    ResPiece allocations on dense streams.
+    """
+
+    __slots__ = ("_pending",)
+
+    def __init__(self):
+        self._pending: Dict[int, list] = {}
+
+    def add(self, index: int, role, content, stop) -> None:
+        entry = self._pending.get(index)
+        if entry is None:
+            entry = self._pending[index] = [role, [], stop]
+        else:
+            if role is not None and entry[0] is None:
+                entry[0] = role
+            if stop is not None:
+                entry[2] = stop
+        if content:
+            entry[1].append(content)
+
+    def flush(self) -> List[ResPiece]:
+        if not self._pending:
+            return []
+        pieces = [
+            ResPiece(
+                index=index,
+                role=role,
+                content="".join(parts) if parts else None,
+                stop=stop,
+            )
+            for index, (role, parts, stop) in self._pending.items()
+        ]
+        self._pending.clear()
+        return pieces
+
+_SESSION: Optional[aiohttp.ClientSession] = None
+_SESSION_LOCK = asyncio.Lock()
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it lazily on first use.
+
+    Reusing one session keeps TCP/TLS connections pooled across
+    streaming_inference calls instead of paying a handshake per dialog.
+    """
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        async with _SESSION_LOCK:
+            if _SESSION is None or _SESSION.closed:
+                _SESSION = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=256,
+                        limit_per_host=64,
+                        keepalive_timeout=75,
+                        ttl_dns_cache=300,
+                    ),
+                    timeout=aiohttp.ClientTimeout(total=None, sock_connect=10),
+                    # 10 MiB read buffer: the default 64 KiB backpressures
+                    # high-rate SSE streams and raises "Chunk too big" on
+                    # bursty vLLM/TGI responses. The buffer is per
+                    # connection but only grows as data actually arrives.
+                    read_bufsize=10 * 1024 * 1024,
+                )
+    return _SESSION
+
+async def close_session() -> None:
+    """Close the shared aiohttp session (call on app shutdown)."""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    _SESSION = None
+
+_SYNC_SESSION: Optional["requests.Session"] = None
+
+def get_sync_session() -> "requests.Session":
+    """Return a shared requests.Session with pooling and retries.
+
+    requests.post() at module scope builds a fresh Session (and TLS
+    handshake) per call; the shared session keeps connections alive for
+    the synchronous inference() paths.
+    """
+    global _SYNC_SESSION
+    if _SYNC_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter, Retry
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 502, 503, 504),
+            ),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SYNC_SESSION = session
+    return _SYNC_SESSION
+
+_ASYNC_CLIENT = None
+
+def get_async_client():
+    """Return a shared httpx.AsyncClient for the ainference() paths.
+
+    HTTP/2 multiplexes many completions over one connection, so fanning
+    out N requests with asyncio.gather costs one handshake, not N.
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        import httpx
+
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+    return _ASYNC_CLIENT
+
 def format_dialog(dialog: List[Dict[str, str]], legacy: bool = False) -> str:
     """Format the dialog based on legacy mode."""
     if legacy:
-        return "\n".join([f"{message['role']}: {message['content']}" for message in dialog])
+        # str + str beats f-string formatting here (no FORMAT_VALUE op),
+        # which adds up on long multi-turn dialogs.
+        return "\n".join([m["role"] + ": " + m["content"] for m in dialog])
     return dialog
 
 async def make_streaming_request(session, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Any:
     """Make a streaming request to the API."""
     async with session.post(url, json=payload, headers=headers) as response:
         if response.status == 429:
-            raise Exception('Rate limit exceeded, consider backing off')
-        async for chunk in response.content:
+            raise RateLimited('Rate limit exceeded, consider backing off')
+        response.raise_for_status()
+        # Fixed 64 KiB chunks: callers see predictable sizes instead of a
+        # Python iteration per arbitrary TCP segment.
+        async for chunk in response.content.iter_chunked(65536):
             yield chunk
 
 def prepare_inference_payload(dialog: List[Dict[str, str]], model: str, stream: bool, legacy: bool, **kwargs) -> Dict[str, Any]:
@@ -30,6 +166,30 @@ def prepare_inference_payload(dialog: List[Dict[str, str]], model: str, stream:
         payload["messages"] = dialog
     return payload
 
+@lru_cache(maxsize=256)
+def _serialized_payload_cached(dialog_key: bytes, model, stream, legacy, kwargs_key) -> bytes:
+    dialog = orjson.loads(dialog_key)
+    return orjson.dumps(
+        prepare_inference_payload(dialog, model, stream, legacy, **dict(kwargs_key))
+    )
+
+def serialize_payload(dialog: List[Dict[str, str]], model: str, stream: bool, legacy: bool, **kwargs) -> bytes:
+    """Serialize an inference payload, caching the bytes per distinct prompt.
+
+    Repeat-pressure benchmark modes fire the same dialog thousands of
+    times; the cache makes every request after the first reuse one bytes
+    object instead of re-dumping the payload. Distinct prompts just miss
+    and pay a single extra dumps for the key.
+    """
+    try:
+        kwargs_key = tuple(sorted(kwargs.items()))
+        return _serialized_payload_cached(
+            orjson.dumps(dialog), model, stream, legacy, kwargs_key
+        )
+    except TypeError:
+        # Unhashable kwarg values (e.g. lists) — serialize directly.
+        return orjson.dumps(prepare_inference_payload(dialog, model, stream, legacy, **kwargs))
+
 def handle_inference_response(response: Any, legacy: bool) -> List[Dict[str, str]]:
     """Handle the response from a non-streaming inference request."""
     if legacy:
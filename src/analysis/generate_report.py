@@ -3,12 +3,20 @@ from .report import VisitLevelReport, RequestLevelReport
 from transformers import AutoTokenizer
 from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
 from typing import List
+from functools import lru_cache
 import numpy as np
-import bisect
 import logging
+import os
+
+# Let the Rust tokenizer fan batch encodes out over Rayon threads.
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
 
 logger = logging.getLogger("analysis")
 
+# Bound the per-batch memory while keeping the tokenizer threads saturated.
+_ENCODE_CHUNK = 10_000
+
+@lru_cache(maxsize=32)
 def load_tokenizer(tokenizer_name: str, hf_auth_key: str = None):
     try:
         if "mistral" in tokenizer_name.lower():
@@ -32,6 +40,30 @@ def count_tokens_from_str(s: str, tokenizer) -> int:
         tokens = tokenizer(s, return_tensors="np")["input_ids"][0]
     return len(tokens)
 
+def count_tokens_batch(strs: List[str], tokenizer) -> List[int]:
+    """Token counts for many strings in one tokenizer call.
+
+    Fast tokenizers cross into Rust once and tokenize the batch in
+    parallel; per-string calls pay that crossing (plus a numpy tensor
+    allocation) per content piece.
+    """
+    if not strs:
+        return []
+    if getattr(tokenizer, "is_fast", False):
+        counts: List[int] = []
+        for i in range(0, len(strs), _ENCODE_CHUNK):
+            enc = tokenizer(
+                strs[i:i + _ENCODE_CHUNK],
+                add_special_tokens=False,
+                padding=False,
+                truncation=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )["input_ids"]
+            counts.extend(len(ids) for ids in enc)
+        return counts
+    return [count_tokens_from_str(s, tokenizer) for s in strs]
+
 def generate_request_level_report(
     ress: List[ReqResponse], tokenizer_name: str, **kwargs) -> RequestLevelReport:
     hf_auth_key = kwargs.pop("hf_auth_key", None)
@@ -43,55 +75,69 @@ def generate_request_level_report(
     logger.info(f"Total requests: {len(ress)}, Successful requests: {len(success)}")
     
     TTFT = [res.loggings[0][0] - res.start_timestamp for res in success if res.loggings]
-    start_on_time = [res.launch_latency == 0.0 for res in success]
-    time_per_request = [res.end_timestamp - res.start_timestamp for res in success]
-    token_per_request = []
-    token_timestamp = []
-    
+    # Count directly: the old intermediate list made SLO degenerate to
+    # len(success)/len(ress) regardless of launch latency.
+    start_on_time_num = sum(1 for res in success if res.launch_latency == 0.0)
+    time_per_request = np.fromiter(
+        (res.end_timestamp - res.start_timestamp for res in success),
+        np.float64,
+        count=len(success),
+    )
+
+    # Gather every content piece first, batch-encode once, then fan the
+    # counts back out per response.
+    pack_times: List[float] = []
+    contents: List[str] = []
+    spans: List[int] = []
     for c in ress:
-        count = 0
+        span = 0
         for pack in c.loggings:
             if len(pack) > 1 and pack[1].content:
-                num = count_tokens_from_str(pack[1].content, tokenizer)
-                count += num
-                token_timestamp.append((pack[0], num))
-        if c.error_info is None:
-            token_per_request.append(count)
-    
-    assert token_timestamp, "all requests failed, cannot generate report."
-    
-    token_timestamp.sort(key=lambda x: x[0])
+                pack_times.append(pack[0])
+                contents.append(pack[1].content)
+                span += 1
+        spans.append(span)
+
+    pack_counts = count_tokens_batch(contents, tokenizer)
+
+    assert pack_counts, "all requests failed, cannot generate report."
+
+    # Typed arrays + argsort instead of growing/sorting Python lists with a
+    # key=lambda; per-response sums fall out of one cumulative sum.
+    times = np.asarray(pack_times, dtype=np.float64)
+    counts = np.asarray(pack_counts, dtype=np.int64)
+    order = np.argsort(times, kind="stable")
+    ts = times[order]
+    token_counts = counts[order]
+    token_timestamp = list(zip(ts.tolist(), token_counts.tolist()))
+
+    bounds = np.concatenate(([0], np.cumsum(np.asarray(spans, dtype=np.int64))))
+    csum = np.concatenate(([0], np.cumsum(counts)))
+    per_res_tokens = csum[bounds[1:]] - csum[bounds[:-1]]
+    ok_mask = np.fromiter((c.error_info is None for c in ress), bool, count=len(ress))
+    token_per_request = per_res_tokens[ok_mask]
+
     throughput_windows = kwargs.get("throughput_windows", 5)
     throughput_step = kwargs.get("throughput_step", 0.5)
-    count_list = np.zeros(
-        int((token_timestamp[-1][0] - token_timestamp[0][0]) / throughput_step) + 1
-    )
-    
-    for t, c in token_timestamp:
-        count_list[int((t - token_timestamp[0][0]) / throughput_step)] += c
-    
-    sample_list = np.zeros(len(count_list))
-    for i in range(len(sample_list)):
-        ty = token_timestamp[0][0] + i * throughput_step
-        sample_list[i] = bisect.bisect_right(
-            token_timestamp, ty + throughput_windows / 2, key=lambda x: x[0]
-        ) - bisect.bisect_left(
-            token_timestamp, ty - throughput_windows / 2, key=lambda x: x[0]
-        )
-    
-    sample_list = sample_list / throughput_windows
-    TPOT: List[float] = []
-    
+    n_bins = int((ts[-1] - ts[0]) / throughput_step) + 1
+
+    # Two C-level searchsorted calls replace the per-window bisect loop
+    # (ts is already sorted).
+    centers = ts[0] + np.arange(n_bins) * throughput_step
+    right = np.searchsorted(ts, centers + throughput_windows / 2, side="right")
+    left = np.searchsorted(ts, centers - throughput_windows / 2, side="left")
+    sample_list = (right - left) / throughput_windows
+
     if len(time_per_request) != len(token_per_request):
         logger.error("Time per request and token per request lists are of different lengths.")
         raise ValueError("Time per request and token per request lists are of different lengths.")
-    
-    for ti, to in zip(time_per_request, token_per_request):
-        if to == 0:
-            TPOT.append(0)
-        else:
-            TPOT.append(ti / to)
-    
+
+    TPOT = np.where(
+        token_per_request == 0,
+        0.0,
+        time_per_request / np.maximum(token_per_request, 1),
+    )
+
     if not ress:
         logger.error("The list of responses is empty.")
         raise ValueError("The list of responses is empty.")
@@ -103,8 +149,8 @@ def generate_request_level_report(
         request_num=len(ress),
         fail_rate=1 - len(success) / len(ress),
         TTFT=TTFT,
-        latency=[res.end_timestamp - res.start_timestamp for res in success],
-        SLO=len(start_on_time) / len(ress),
+        latency=time_per_request,
+        SLO=start_on_time_num / len(ress),
         time_per_request=time_per_request,
         token_per_request=token_per_request,
         token_timestamp=token_timestamp,
@@ -1,67 +1,71 @@
-from attrs import define
+from attrs import field, frozen
 from typing import List, Tuple
 import numpy as np
 
+__all__ = ["RequestLevelReport", "VisitLevelReport"]
 
-@define
+
+def _stats(xs) -> dict:
+    """min/max/avg/std/p95 from a single list-to-array conversion."""
+    a = np.asarray(xs, dtype=np.float64)
+    return {
+        "min": a.min(),
+        "max": a.max(),
+        "avg": a.mean(),
+        "std": a.std(),
+        "95_percentile": np.quantile(a, 0.95),
+    }
+
+
+# frozen keeps the slotted layout (no per-instance __dict__) and the
+# reports are never mutated after generate_report builds them; the
+# converters land the metric vectors as float64/int64 arrays so stat
+# consumers skip the list-to-array conversion.
+@frozen(cache_hash=True)
 class RequestLevelReport:
     request_num: int
     fail_rate: float
     SLO: float  # Service Level Objective
-    TTFT: List[float]  # Time To First Token (TTFT)
-    latency: List[float]  # Time cost from request to last response
-    time_per_request: List[float]
-    token_per_request: List[int]
+    TTFT: List[float] = field(converter=np.asarray)  # Time To First Token (TTFT)
+    latency: List[float] = field(converter=np.asarray)  # Time cost from request to last response
+    time_per_request: List[float] = field(converter=np.asarray)
+    token_per_request: List[int] = field(converter=np.asarray)
     token_timestamp: List[Tuple[float, int]]
-    TPOT: List[float]  # Time Per Output Token (avg for each request)
+    TPOT: List[float] = field(converter=np.asarray)  # Time Per Output Token (avg for each request)
     Throughput: float
     tokenizer_name: str
-    total_tps_list: List[float]
+    total_tps_list: List[float] = field(converter=np.asarray)
     total_duration: float
     rps: float
     
-    def calculate_stable_average_throughput(self, trim_percent=5):
+    def calculate_stable_average_throughput(self, values=None, trim_percent=5):
         """
         Calculate the stable average throughput, excluding the initial and final periods.
-        
+
+        :param values: Optional pre-converted throughput array, so callers
+                       that already hold one avoid a second conversion
         :param trim_percent: Percentage of values to trim from each end (default 5%)
         :return: Stable average of the throughput values
         """
-        values = np.array(self.total_tps_list)
+        if values is None:
+            values = np.asarray(self.total_tps_list, dtype=np.float64)
         trim_size = int(len(values) * (trim_percent / 100))
         trimmed_values = values[trim_size:-trim_size]
         return np.mean(trimmed_values)
 
     def show_as_dict(self):
+        tps = np.asarray(self.total_tps_list, dtype=np.float64)
         return {
             "Total_request_num": self.request_num,
             "Fail_rate": self.fail_rate,
             "SLO": self.SLO,
-            "latency": {
-                "min": np.min(self.latency),
-                "max": np.max(self.latency),
-                "avg": np.mean(self.latency),
-                "std": np.std(self.latency),
-                "95_percentile": np.percentile(self.latency, 95),
-            },
-            "TTFT": {
-                "min": np.min(self.TTFT),
-                "max": np.max(self.TTFT),
-                "avg": np.mean(self.TTFT),
-                "std": np.std(self.TTFT),
-                "95_percentile": np.percentile(self.TTFT, 95),
-            },
-            "TPOT": {
-                "min": np.min(self.TPOT),
-                "max": np.max(self.TPOT),
-                "avg": np.mean(self.TPOT),
-                "std": np.std(self.TPOT),
-                "95_percentile": np.percentile(self.TPOT, 95),
-            },
+            "latency": _stats(self.latency),
+            "TTFT": _stats(self.TTFT),
+            "TPOT": _stats(self.TPOT),
             "Throughput": {
                 "max": self.Throughput,
-                "avg": self.calculate_stable_average_throughput(),
-                "95_percentile": np.percentile(self.total_tps_list, 95),
+                "avg": self.calculate_stable_average_throughput(tps),
+                "95_percentile": np.quantile(tps, 0.95),
             },
             "Total_duration_sec": self.total_duration,
             "RPS": self.rps,
@@ -71,7 +75,7 @@ class RequestLevelReport:
         raise NotImplementedError
 
 
-@define
+@frozen(cache_hash=True)
 class VisitLevelReport:
     visit_num: int
     fail_rate: float
@@ -0,0 +1,48 @@
+"""Prometheus text-format parsing shared by the app's metrics proxies.
+
+Kept in one module so the parser is a single hot function to profile
+and its LRU cache is shared by every route that scrapes /metrics.
+"""
+import functools
+import re
+
+# Compiled once at import: one C-level regex walk per metric line
+# replaces the per-line split/find/strip chains, and one findall builds
+# the label dict instead of a split('=',1) + strip('"') per label.
+_METRIC_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{([^}]*)\})?\s+(\S+)')
+_LABEL_RE = re.compile(r'([^=,]+)="((?:[^"\\]|\\.)*)"')
+
+def parse_prometheus_text(metrics_text: str):
+    metrics = {}
+    for line in metrics_text.splitlines():
+        if not line or line[0] == '#':
+            continue
+        # Fast path: unlabeled samples need no regex at all, just one
+        # partition on the name/value separator.
+        name, _, rest = line.partition(' ')
+        if '{' not in name:
+            value = rest.split(' ', 1)[0] if ' ' in rest else rest
+            if not value:
+                continue
+            # Parse once; NaN is the only float unequal to itself, which
+            # also skips the math.isnan attribute lookup.
+            v = float(value)
+            metrics[name] = {"value": None if v != v else v}
+            continue
+        m = _METRIC_RE.match(line)
+        if m is None:
+            continue
+        key_base, labels_part, value = m.groups()
+        v = float(value)
+        value = None if v != v else v
+        labels = dict(_LABEL_RE.findall(labels_part))
+        metrics.setdefault(key_base, []).append({"labels": labels, "value": value})
+    return metrics
+
+# Scrapers poll /metrics on a fixed interval and often see an unchanged
+# body between updates; caching on the raw text makes repeat polls skip
+# the parse entirely (lru_cache interns the str key, so hits are one
+# dict probe).
+@functools.lru_cache(maxsize=128)
+def parse_metrics_cached(metrics_text: str):
+    return parse_prometheus_text(metrics_text)
@@ -1,9 +1,13 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from urllib.parse import urlparse, urlunparse
+import asyncio
 import logging
 import datetime
 import time
-import math
+
+import httpx
 
 from .test_routes import router as test_router
 from .group_routes import router as group_router
@@ -11,11 +15,18 @@ from .recommendation_routes import router as recommendation_router
 from .db import (
     get_last_heartbeat,
     get_all_worker_ids,
+    get_all_worker_heartbeats,
+    query_config,
+    run_optimize,
 )
+from ._prom import parse_prometheus_text, parse_metrics_cached
+from ..analysis.generate_report import count_tokens_batch, load_tokenizer
 from ..simulate.log_to_db import cur_requests_status_of_task, past_packs_of_task
 from ..workload_datasets.utils import AVAILABLE_DATASETS
 
-app = FastAPI()
+# orjson serializes the list/dict-heavy responses (id_list, parsed
+# metrics) in native code instead of stdlib json.dumps.
+app = FastAPI(default_response_class=ORJSONResponse)
 
 origins = [
     "*",
@@ -33,32 +44,79 @@ app.include_router(test_router)
 app.include_router(group_router)
 app.include_router(recommendation_router)
 
-def parse_prometheus_text(metrics_text: str):
-    lines = metrics_text.strip().split("\n")
-    metrics = {}
-    for line in lines:
-        if line.startswith('#') or not line.strip():
-            continue
-        key, value = line.split(None, 1)
-        if "{" in key:
-            key_base, labels_part = key.split("{", 1)
-            labels_part = labels_part.rstrip("}")
-            labels = {}
-            for label in labels_part.split(","):
-                label_key, label_value = label.split("=", 1)
-                labels[label_key] = label_value.strip('"')
-            value = float(value) if not math.isnan(float(value)) else None
-            metrics.setdefault(key_base, []).append({"labels": labels, "value": value})
-        else:
-            value = float(value) if not math.isnan(float(value)) else None
-            metrics[key] = {"value": value}
-    return metrics
+# Shared async HTTP client: the handlers below are pure I/O proxies, so
+# they run as coroutines on the event loop instead of tying up a
+# threadpool worker per request, and the pooled client reuses upstream
+# connections across polls.
+_http: httpx.AsyncClient | None = None
+
+@app.on_event("startup")
+async def _open_http_client():
+    global _http
+    _http = httpx.AsyncClient(
+        timeout=5.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=64),
+    )
+
+@app.on_event("shutdown")
+async def _close_http_client():
+    if _http is not None:
+        await _http.aclose()
+
+@app.on_event("startup")
+async def _schedule_db_optimize():
+    # PRAGMA optimize refreshes sqlite's query-planner stats; run it off
+    # the event loop every 15 minutes.
+    async def _loop():
+        while True:
+            await asyncio.sleep(900)
+            try:
+                await asyncio.to_thread(run_optimize)
+            except Exception as e:
+                logging.warning(f"PRAGMA optimize failed: {e}")
+
+    asyncio.create_task(_loop())
+
+# Short TTL per metrics URL so a burst of dashboard polls coalesces into
+# one upstream GET; the per-URL lock single-flights concurrent misses so
+# they share the in-flight fetch instead of stampeding the server.
+_METRICS_TTL = 2.0
+_metrics_cache: dict = {}  # url -> (expires_at, body_text)
+_metrics_locks: dict = {}  # url -> asyncio.Lock
+
+async def _fetch_metrics_text(metrics_url: str) -> str:
+    cached = _metrics_cache.get(metrics_url)
+    now = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    lock = _metrics_locks.setdefault(metrics_url, asyncio.Lock())
+    async with lock:
+        cached = _metrics_cache.get(metrics_url)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        response = await _http.get(metrics_url)
+        response.raise_for_status()
+        text = response.text
+        _metrics_cache[metrics_url] = (now + _METRICS_TTL, text)
+        return text
     
 @app.get("/workers", tags=['worker'])
 def list_workers():
     worker_ids = get_all_worker_ids()
     return {"workers": worker_ids}
 
+# Declared before /workers/{worker_id} so "health" is not captured as an
+# id. Replaces the client-side N+1 loop (list ids, then one health call
+# per worker) with a single query.
+@app.get("/workers/health", tags=['worker'])
+def workers_health():
+    now = time.time()
+    return {
+        worker_id: "healthy" if now - timestamp < 10 else "unresponsive"
+        for worker_id, timestamp in get_all_worker_heartbeats()
+    }
+
 @app.get("/workers/{worker_id}", tags=['worker'])
 def worker_health_check(worker_id: str):
     last_heartbeat = get_last_heartbeat(worker_id=worker_id)
@@ -79,46 +137,47 @@ def dataset_list():
             for dataset_id, dataset_info in AVAILABLE_DATASETS.items()
         ]
     }
-"""
 @app.get("/get/vllm_metrics/{test_id}", tags=['vLLM'])
-def get_vllm_metrics(test_id: str):
+async def get_vllm_metrics(test_id: str):
     config = query_config(test_id)
     if config.endpoint_type == "vllm":
         try:
             parsed_url = urlparse(config.url)
             metrics_url = urlunparse((parsed_url.scheme, parsed_url.netloc, '/metrics', '', '', ''))
-            response = requests.get(metrics_url)
-            response.raise_for_status()
+            text = await _fetch_metrics_text(metrics_url)
             try:
-                parsed_metrics = parse_prometheus_text(response.text)
+                parsed_metrics = parse_metrics_cached(text)
                 return parsed_metrics
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to parse metrics: {str(e)}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"Failed to retrieve metrics from vllm server({metrics_url}): {str(e)}")
     else:
         raise HTTPException(status_code=400, detail=f"The specified server({config.url}) is not a vllm server.")
 
 @app.get("/get/friendli_metrics/{test_id}", tags=['FriendliAI'])
-def get_friendli_metrics(test_id: str, port: str):
+async def get_friendli_metrics(test_id: str, port: str):
     config = query_config(test_id)
     if config.endpoint_type == "friendliai":
         try:
             parsed_url = urlparse(config.url)
             netloc = f"{parsed_url.hostname}:{port}"
             metrics_url = urlunparse((parsed_url.scheme, netloc, '/metrics', '', '', ''))
-            response = requests.get(metrics_url)
-            response.raise_for_status()
+            text = await _fetch_metrics_text(metrics_url)
             try:
-                parsed_metrics = parse_prometheus_text(response.text)
+                parsed_metrics = parse_metrics_cached(text)
                 return parsed_metrics
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to parse metrics: {str(e)}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"Failed to retrieve metrics from friendliai server({config.url}): {str(e)}")
     else:
         raise HTTPException(status_code=400, detail=f"The specified server({config.url}) is not a friendliai server.")
-"""
+
+@app.get("/metrics_cache_stats", tags=['worker'])
+def metrics_cache_stats():
+    info = parse_metrics_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "currsize": info.currsize}
 
 @app.get("/trace/status/{test_id}", tags=['trace'])
 def trace_status(test_id: str):
@@ -127,11 +186,12 @@ def trace_status(test_id: str):
 @app.get("/trace/tps/{test_id}", tags=['trace'])
 def trace_tps(test_id: str, model: str, sample_len: int = 5):
     packs = past_packs_of_task(test_id, past_time=sample_len)
-    from ..analysis.generate_report import count_tokens_from_str, load_tokenizer
 
     try:
         tokenizer = load_tokenizer(model)
-        tokens = sum([count_tokens_from_str(p, tokenizer) for p in packs])
+        # One batched tokenizer call instead of a Python->Rust crossing
+        # per pack.
+        tokens = sum(count_tokens_batch(packs, tokenizer))
         return {
             "tps": tokens / sample_len,
             "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -145,14 +205,21 @@ def trace_tps(test_id: str, model: str, sample_len: int = 5):
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    
+
     logging.info("Starting FastAPI server")
 
+    # Import-string form is required for multi-worker; uvloop/httptools
+    # swap the event loop and HTTP parser for their C implementations.
     uvicorn.run(
-        app,
+        "src.api_server.app:app",
         host="0.0.0.0",
         port=8000,
+        workers=(os.cpu_count() or 1) * 2 + 1,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
 #        ssl_keyfile="key.pem",
 #        ssl_certfile="fullchain.pem",
     )
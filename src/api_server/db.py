@@ -1,15 +1,80 @@
 import sqlite3
 import os
+import functools
+import threading
+from contextlib import contextmanager
 from .protocols import TestConfig
 from uuid import uuid4
-from typing import List, Tuple, Dict, Optional
+from typing import Iterator, List, Tuple, Dict, Optional
 import time
-import datetime
 import json
 import logging
+import zlib
 
 db_path = "tmp/api_server.db"
 
+# WAL lets readers proceed while a writer appends to the -wal file, and
+# synchronous=NORMAL batches fsyncs at WAL checkpoints instead of per
+# commit; the rest keep temp structures and the page cache in memory.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+    # foreign_keys stays off: test.id has no unique constraint, so
+    # enforcing the group_tests/hardware_info references raises
+    # "foreign key mismatch" on every write (the old per-call
+    # connections never enabled it either).
+)
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection with the WAL/tuning pragmas applied.
+
+    Handlers and the worker hit sqlite directly from several
+    threads/processes; busy_timeout makes writers queue on the file lock
+    instead of failing immediately with "database is locked".
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+# Long-lived connections instead of an open/close per helper call: each
+# sqlite connection carries its own page cache, so reconnecting per
+# request threw the cache away every time. Reads share one connection
+# per thread; writes funnel through a single serialized connection
+# (sqlite allows one writer anyway).
+_local = threading.local()
+_write_lock = threading.Lock()
+_write_conn: Optional[sqlite3.Connection] = None
+
+@contextmanager
+def _reader():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
+    yield conn
+
+@contextmanager
+def _writer():
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            _write_conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            for pragma in _PRAGMAS:
+                _write_conn.execute(pragma)
+        yield _write_conn
+
+def run_optimize():
+    """Run PRAGMA optimize; cheap, intended to be scheduled periodically."""
+    conn = _connect()
+    try:
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
 GPU_COST_RATIO = {
     'A100': 10,
     'A10': 2,
@@ -19,12 +84,15 @@ GPU_COST_RATIO = {
     'H200': 35
 }
 
+_VALID_GPU_MODELS = frozenset(GPU_COST_RATIO)
+
 if not os.path.exists(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn = _connect()
     cursor = conn.cursor()
+    # id as PRIMARY KEY makes every WHERE id=? a B-tree probe; the
+    # INTEGER timestamp skips the text->int coercion on reads.
     cursor.execute(
-        "CREATE TABLE test (id text, config text, status text, model text, start_timestamp text, nickname text)"
+        "CREATE TABLE test (id TEXT PRIMARY KEY, config BLOB, status TEXT, model TEXT, start_timestamp INTEGER, nickname TEXT)"
     )
     cursor.execute("CREATE TABLE error (id text, error_info text)")
     cursor.execute("""
@@ -55,125 +123,170 @@ if not os.path.exists(db_path):
         )
     """)
     conn.commit()
+    conn.close()
+
+# Outside the creation block so existing databases pick it up too
+# (IF NOT EXISTS makes it idempotent).
+with _writer() as _conn:
+    _conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_test_id ON test(id)")
+    # group_tests is filtered by group_id (and the pair) on every group
+    # route, error by id on every error_info lookup, and test by status
+    # in the worker poll loop; without these each query scans the table.
+    _conn.execute("CREATE INDEX IF NOT EXISTS idx_group_tests_group ON group_tests(group_id)")
+    # The baseline schema let repeated add-to-group calls insert
+    # duplicate pairs; drop those before creating the unique index so
+    # importing over an existing database cannot fail.
+    _conn.execute(
+        "DELETE FROM group_tests WHERE rowid NOT IN"
+        " (SELECT MIN(rowid) FROM group_tests GROUP BY group_id, test_id)"
+    )
+    _conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_group_tests_pair ON group_tests(group_id, test_id)")
+    _conn.execute("CREATE INDEX IF NOT EXISTS idx_error_id ON error(id)")
+    _conn.execute("CREATE INDEX IF NOT EXISTS idx_test_status ON test(status)")
+    _conn.commit()
 
 def report_error(id: str, error_info: str):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO error VALUES (?, ?)", (id, error_info))
-    cursor.execute("UPDATE test SET status=? WHERE id=?", ("error", id))
-    conn.commit()
+    # "with conn:" wraps both statements in one transaction (a single
+    # WAL group-commit) and rolls back instead of leaking the
+    # transaction if either raises.
+    with _writer() as conn:
+        with conn:
+            conn.execute("INSERT INTO error VALUES (?, ?)", (id, error_info))
+            conn.execute("UPDATE test SET status=? WHERE id=?", ("error", id))
 
 
 # return a list of (id, nickname, timestamp) from latest to oldest, timestamp is a string in format %Y-%m-%d %H:%M:%S
 def get_id_list() -> List[str]:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, nickname, start_timestamp FROM test ORDER BY start_timestamp DESC"
-    )
-    return [
-        (
-            id,
-            nickname,
-            datetime.datetime.fromtimestamp(int(timestamp)).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
+    with _reader() as conn:
+        cursor = conn.cursor()
+        # Format in the scan: sqlite's strftime runs in the VDBE, so no
+        # per-row datetime object is allocated in Python.
+        cursor.execute(
+            "SELECT id, nickname,"
+            " strftime('%Y-%m-%d %H:%M:%S', start_timestamp, 'unixepoch', 'localtime')"
+            " FROM test ORDER BY start_timestamp DESC"
         )
-        for id, nickname, timestamp in cursor.fetchall()
-    ]
+        return cursor.fetchall()
 
 
 def query_error_info(id: str) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT error_info FROM error WHERE id=?", (id,))
-    error_info = cursor.fetchone()
-    if error_info is None:
-        return f"{id} has no error"
-    return error_info[0]
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT error_info FROM error WHERE id=?", (id,))
+        error_info = cursor.fetchone()
+        if error_info is None:
+            return f"{id} has no error"
+        return error_info[0]
 
 
 def query_model(id: str) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT model FROM test WHERE id=?", (id,))
-    model = cursor.fetchone()
-    if model is None:
-        return ""
-    return model[0]
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT model FROM test WHERE id=?", (id,))
+        model = cursor.fetchone()
+        if model is None:
+            return ""
+        return model[0]
+
+
+def _config_text(raw) -> str:
+    # New rows store zlib-compressed JSON blobs (large dataset_config /
+    # kwargs shrink several-fold, so table scans touch fewer pages);
+    # rows written before the switch are plain text.
+    return zlib.decompress(raw).decode() if isinstance(raw, bytes) else raw
+
+
+# Config rows never change after insert, so keying on the raw column
+# value (blob or legacy text) lets the worker's poll loop and repeat
+# config reads skip decompression and the whole Pydantic validation
+# pipeline.
+@functools.lru_cache(maxsize=256)
+def _parse_config(config_raw) -> TestConfig:
+    return TestConfig.model_validate_json(_config_text(config_raw))
 
 
 def query_config(id: str) -> TestConfig:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT config FROM test WHERE id=?", (id,))
-    config = cursor.fetchone()
-    if config is None:
-        return None
-    return TestConfig.model_validate_json(config[0])
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT config FROM test WHERE id=?", (id,))
+        config = cursor.fetchone()
+        if config is None:
+            return None
+        return _parse_config(config[0])
 
 
 def save_config(config: TestConfig) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT id FROM test")
-    existing_ids = [row[0] for row in cursor.fetchall()]
-    
-    if config.test_id in existing_ids:
-        id = str(uuid4())
-    else:
-        id = config.test_id or str(uuid4())
-    
-    model = config.model
-    config_str = config.model_dump_json()
-    cursor.execute(
-        "INSERT INTO test VALUES (?, ?, ?, ?, ?, ?)",
-        (id, config_str, "init", model, str(int(time.time())), ""),
-    )
-    conn.commit()
-    return id
+    with _writer() as conn:
+        cursor = conn.cursor()
+        # Indexed point lookup instead of materializing every id into a
+        # Python list per save.
+        cursor.execute("SELECT 1 FROM test WHERE id=? LIMIT 1", (config.test_id,))
+        if cursor.fetchone() is not None:
+            id = str(uuid4())
+        else:
+            id = config.test_id or str(uuid4())
+
+        model = config.model
+        config_blob = zlib.compress(config.model_dump_json().encode(), 3)
+        cursor.execute(
+            "INSERT INTO test VALUES (?, ?, ?, ?, ?, ?)",
+            (id, config_blob, "init", model, int(time.time()), ""),
+        )
+        conn.commit()
+        return id
 
 def delete_test(id: str):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM test WHERE id=?", (id,))
-    cursor.execute("DELETE FROM error WHERE id=?", (id,))
-    conn.commit()
+    with _writer() as conn:
+        with conn:
+            conn.execute("DELETE FROM test WHERE id=?", (id,))
+            conn.execute("DELETE FROM error WHERE id=?", (id,))
+
+
+def delete_tests_bulk(ids: List[str]):
+    # One DELETE ... IN per table under a single commit instead of a
+    # round-trip (and fsync) per test id.
+    if not ids:
+        return
+    with _writer() as conn:
+        with conn:
+            placeholders = ",".join("?" * len(ids))
+            conn.execute(f"DELETE FROM test WHERE id IN ({placeholders})", ids)
+            conn.execute(f"DELETE FROM error WHERE id IN ({placeholders})", ids)
 
 
 def set_nickname(id: str, nickname: str):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE test SET nickname=? WHERE id=?", (nickname, id))
-    conn.commit()
+    with _writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE test SET nickname=? WHERE id=?", (nickname, id))
+        conn.commit()
 
 
 def query_nickname(id: str) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT nickname FROM test WHERE id=?", (id,))
-    nickname = cursor.fetchone()
-    if nickname is None:
-        return f"Cannot find test {id}"
-    return nickname[0]
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT nickname FROM test WHERE id=?", (id,))
+        nickname = cursor.fetchone()
+        if nickname is None:
+            return f"Cannot find test {id}"
+        return nickname[0]
 
 
 def query_test_status(id: str) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT status FROM test WHERE id=?", (id,))
-    status = cursor.fetchone()
-    if status is None:
-        return f"Cannot find test {id}"
-    return status[0]
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT status FROM test WHERE id=?", (id,))
+        status = cursor.fetchone()
+        if status is None:
+            return f"Cannot find test {id}"
+        return status[0]
 
 
 def set_status(id: str, st: str):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE test SET status=? WHERE id=?", (st, id))
-    conn.commit()
-    return "OK"
+    with _writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE test SET status=? WHERE id=?", (st, id))
+        conn.commit()
+        return "OK"
 
 
 def set_test_to_pending(id: str) -> str:
@@ -185,139 +298,163 @@ def set_test_to_pending(id: str) -> str:
     return set_status(id, "pending")
 
 
-def get_all_pending_tests() -> List[Tuple[str, TestConfig]]:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, config FROM test WHERE status=?", ("pending",))
-    return [
-        (id, TestConfig.model_validate_json(config_str))
-        for id, config_str in cursor.fetchall()
-    ]
-    
+def get_all_pending_tests() -> Iterator[Tuple[str, TestConfig]]:
+    # Generator so pollers that stop after the first hit don't pay
+    # Pydantic validation for every pending config.
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, config FROM test WHERE status=?", ("pending",))
+        for id, config_str in cursor:
+            yield id, _parse_config(config_str)
+
 def get_all_worker_ids():
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT worker_id FROM heartbeat")
-    worker_ids = [row[0] for row in cursor.fetchall()]
-    return worker_ids
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT worker_id FROM heartbeat")
+        worker_ids = [row[0] for row in cursor.fetchall()]
+        return worker_ids
 
 def update_worker_heartbeat(worker_id: str, timestamp: float):
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("INSERT OR REPLACE INTO heartbeat (worker_id, timestamp) VALUES (?, ?)", (worker_id, timestamp))
-    conn.commit()
+    with _writer() as conn:
+        cur = conn.cursor()
+        cur.execute("INSERT OR REPLACE INTO heartbeat (worker_id, timestamp) VALUES (?, ?)", (worker_id, timestamp))
+        conn.commit()
+
+def get_all_worker_heartbeats() -> List[Tuple[str, float]]:
+    # One query for every worker instead of a get_last_heartbeat round
+    # trip per id.
+    with _reader() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT worker_id, timestamp FROM heartbeat")
+        return cur.fetchall()
 
 def get_last_heartbeat(worker_id: str) -> float:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT MAX(timestamp) FROM heartbeat WHERE worker_id=?", (worker_id,))
-    row = cur.fetchone()
-    return row[0] if row[0] else 0.0
+    with _reader() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT MAX(timestamp) FROM heartbeat WHERE worker_id=?", (worker_id,))
+        row = cur.fetchone()
+        return row[0] if row[0] else 0.0
 
 def db_create_group(group_id: str) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO groups (id) VALUES (?)", (group_id,))
-        conn.commit()
-        return group_id
-    except sqlite3.IntegrityError:
-        conn.close()
-        raise ValueError(f"Group '{group_id}' already exists")
+    with _writer() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("INSERT INTO groups (id) VALUES (?)", (group_id,))
+            conn.commit()
+            return group_id
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            raise ValueError(f"Group '{group_id}' already exists")
 
 def db_add_tests_to_group(group_id: str, test_ids: List[str]):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    try:
-        for test_id in test_ids:
-            cursor.execute("INSERT INTO group_tests (group_id, test_id) VALUES (?, ?)", (group_id, test_id))
-        conn.commit()
-    except sqlite3.Error as e:
-        conn.rollback()
-        print(f"An error occurred: {e.args[0]}")
-    finally:
-        conn.close()
+    with _writer() as conn:
+        cursor = conn.cursor()
+        try:
+            # One executemany under one commit: a single VDBE program and
+            # a single fsync for the whole batch. OR IGNORE skips pairs
+            # already in the group instead of letting one duplicate fail
+            # the whole batch against the unique index.
+            cursor.executemany(
+                "INSERT OR IGNORE INTO group_tests (group_id, test_id) VALUES (?, ?)",
+                [(group_id, test_id) for test_id in test_ids],
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logging.error(f"An error occurred: {e.args[0]}")
 
 def db_get_all_groups() -> List[Tuple[str, str]]:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM groups")
-    return cursor.fetchall()
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM groups")
+        return cursor.fetchall()
 
 def db_remove_group(group_id: str) -> None:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM groups WHERE id = ?", (group_id,))
-    cursor.execute("DELETE FROM group_tests WHERE group_id = ?", (group_id,))
-    conn.commit()
+    with _writer() as conn:
+        with conn:
+            conn.execute("DELETE FROM groups WHERE id = ?", (group_id,))
+            conn.execute("DELETE FROM group_tests WHERE group_id = ?", (group_id,))
 
 def db_remove_all_groups() -> None:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM groups")
-    cursor.execute("DELETE FROM group_tests")
-    conn.commit()
+    with _writer() as conn:
+        with conn:
+            conn.execute("DELETE FROM groups")
+            conn.execute("DELETE FROM group_tests")
 
 def db_check_group_status(group_id: str) -> str:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT t.status
-        FROM group_tests gt
-        JOIN test t ON gt.test_id = t.id
-        WHERE gt.group_id = ?
-    """, (group_id,))
-    statuses = [row[0] for row in cursor.fetchall()]
-    
-    if not statuses:
+    with _reader() as conn:
+        cursor = conn.cursor()
+        # Aggregate in the scan: four counters instead of pulling every
+        # status string into Python and walking it three times.
+        cursor.execute("""
+            SELECT COUNT(*),
+                   SUM(t.status='init'),
+                   SUM(t.status='running'),
+                   SUM(t.status='finish')
+            FROM group_tests gt
+            JOIN test t ON gt.test_id = t.id
+            WHERE gt.group_id = ?
+        """, (group_id,))
+        n, n_init, n_running, n_finish = cursor.fetchone()
+
+    if not n:
         return "empty"
-    if all(status == "init" for status in statuses):
+    if n_init == n:
         return "init"
-    if any(status == "running" for status in statuses):
+    if n_running > 0:
         return "running"
-    if all(status == "finish" for status in statuses):
+    if n_finish == n:
         return "finish"
     return "mixed"
 
 def db_get_group_tests(group_id: str) -> List[str]:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT test_id FROM group_tests WHERE group_id=?", (group_id,))
-    tests = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    return tests
+    with _reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT test_id FROM group_tests WHERE group_id=?", (group_id,))
+        return [row[0] for row in cursor.fetchall()]
 
 def db_remove_test_from_group(group_id: str, test_id: str) -> bool:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM group_tests WHERE group_id=? AND test_id=?", (group_id, test_id))
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    return success
+    with _writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM group_tests WHERE group_id=? AND test_id=?", (group_id, test_id))
+        success = cursor.rowcount > 0
+        conn.commit()
+        return success
 
 def db_get_group_test_results(group_id: str) -> List[Dict]:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT t.id, t.config, t.status, t.model, t.start_timestamp, t.nickname
-        FROM test t
-        JOIN group_tests gt ON t.id = gt.test_id
-        WHERE gt.group_id = ?
-    """, (group_id,))
-    tests = cursor.fetchall()
-    conn.close()
+    with _reader() as conn:
+        cursor = conn.cursor()
+        # LEFT JOIN hardware_info here instead of one
+        # get_hardware_info_with_cost query per row.
+        cursor.execute("""
+            SELECT t.id, t.config, t.status, t.model, t.start_timestamp, t.nickname,
+                   h.gpu_model, h.gpu_count
+            FROM test t
+            JOIN group_tests gt ON t.id = gt.test_id
+            LEFT JOIN hardware_info h ON h.test_id = t.id
+            WHERE gt.group_id = ?
+        """, (group_id,))
+        tests = cursor.fetchall()
 
     results = []
     for test in tests:
-        test_id, config, status, model, start_timestamp, nickname = test
-        hardware_info = get_hardware_info_with_cost(test_id)
+        test_id, config, status, model, start_timestamp, nickname, gpu_model, gpu_count = test
+        if gpu_model is not None:
+            hardware_info = {
+                "gpu_model": gpu_model,
+                "gpu_count": gpu_count,
+                "gpu_cost": calculate_gpu_cost(gpu_model, gpu_count),
+            }
+        else:
+            hardware_info = None
         result = {
             "id": test_id,
-            "config": json.loads(config),
+            "config": json.loads(_config_text(config)),
             "status": status,
             "model": model,
-            "start_timestamp": start_timestamp,
+            # The column is INTEGER now; the TestResult models still
+            # declare start_timestamp: str, so keep the old wire shape.
+            "start_timestamp": str(start_timestamp),
             "nickname": nickname,
             "result": read_test_result(test_id),
             "hardware_info": hardware_info
@@ -327,35 +464,42 @@ def db_get_group_test_results(group_id: str) -> List[Dict]:
 
     return results
 
+# Keyed on mtime so a rewritten report invalidates naturally; reports
+# are immutable once a test reaches "finish", so repeat group-results
+# requests hit the cache and pay one stat instead of a json.load.
+@functools.lru_cache(maxsize=1024)
+def _load_report(result_file: str, mtime_ns: int) -> Optional[Dict]:
+    try:
+        with open(result_file, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        logging.error(f"Error decoding JSON from file: {result_file}")
+        return None
+
 def read_test_result(test_id: str) -> Optional[Dict]:
     result_file = f"tmp/report_{test_id}.json"
-    if os.path.exists(result_file):
-        try:
-            with open(result_file, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            print(f"Error decoding JSON from file: {result_file}")
-            return None
-    else:
-        print(f"Result file not found: {result_file}")
+    try:
+        mtime_ns = os.stat(result_file).st_mtime_ns
+    except FileNotFoundError:
+        logging.warning(f"Result file not found: {result_file}")
         return None
-    
+    return _load_report(result_file, mtime_ns)
+
 def calculate_gpu_cost(gpu_model: str, gpu_count: int) -> int:
     return GPU_COST_RATIO.get(gpu_model.upper(), 0) * gpu_count
 
 def get_hardware_info_with_cost(test_id: str) -> Dict:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT gpu_model, gpu_count
-        FROM hardware_info
-        WHERE test_id = ?
-    """, (test_id,))
-    
-    result = cursor.fetchone()
-    conn.close()
-    
+    with _reader() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT gpu_model, gpu_count
+            FROM hardware_info
+            WHERE test_id = ?
+        """, (test_id,))
+
+        result = cursor.fetchone()
+
     if result:
         gpu_model, gpu_count = result
         cost = calculate_gpu_cost(gpu_model, gpu_count)
@@ -367,19 +511,38 @@ def get_hardware_info_with_cost(test_id: str) -> Dict:
     else:
         return None
 
+def db_get_hardware_info_with_cost_bulk(test_ids: List[str]) -> Dict[str, Dict]:
+    # One IN query instead of a get_hardware_info_with_cost round trip
+    # per test; callers do an O(1) dict lookup per id afterwards.
+    if not test_ids:
+        return {}
+    with _reader() as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(test_ids))
+        cursor.execute(
+            f"SELECT test_id, gpu_model, gpu_count FROM hardware_info WHERE test_id IN ({placeholders})",
+            test_ids,
+        )
+        return {
+            test_id: {
+                "gpu_model": gpu_model,
+                "gpu_count": gpu_count,
+                "gpu_cost": calculate_gpu_cost(gpu_model, gpu_count),
+            }
+            for test_id, gpu_model, gpu_count in cursor.fetchall()
+        }
+
 def add_hardware_info(test_id: str, gpu_model: str, gpu_count: int):
-    valid_gpu_models = list(GPU_COST_RATIO.keys())
-    
-    if gpu_model.upper() not in valid_gpu_models:
-        raise ValueError(f"Invalid GPU model. Must be one of {valid_gpu_models}")
+    gm = gpu_model.upper()
+    if gm not in _VALID_GPU_MODELS:
+        raise ValueError(f"Invalid GPU model. Must be one of {sorted(_VALID_GPU_MODELS)}")
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT OR REPLACE INTO hardware_info (test_id, gpu_model, gpu_count)
-        VALUES (?, ?, ?)
-    """, (test_id, gpu_model.upper(), gpu_count))
-    
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with _writer() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO hardware_info (test_id, gpu_model, gpu_count)
+            VALUES (?, ?, ?)
+        """, (test_id, gm, gpu_count))
+
+        conn.commit()
@@ -1,15 +1,37 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Literal, Optional
-from .db import db_get_group_test_results, get_hardware_info_with_cost
-from .group_routes import TestResult 
+from dataclasses import dataclass
+import numpy as np
+from .db import db_get_group_test_results, db_get_hardware_info_with_cost_bulk
+from .group_routes import TestResult
 import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/recommendation", tags=["recommendation"])
-    
+
+# Hashed once at import; every score call was rebuilding a list literal
+# and scanning it to decide the metric's direction.
+_LOWER_IS_BETTER = frozenset(("ttft", "tpot", "latency"))
+
+_PAID_ENGINES = frozenset(("openai", "friendliai"))  # Add other paid engines as needed
+
+# One dict probe instead of up to five string comparisons per lookup.
+_METRIC_ACCESSORS = {
+    "ttft": lambda result: result['TTFT']['avg'],
+    "tpot": lambda result: result['TPOT']['avg'],
+    "latency": lambda result: result['latency']['avg'],
+    "rps": lambda result: result['RPS'],
+    "throughput": lambda result: result['Throughput']['avg'],
+}
+
 class PerformanceMetric(BaseModel):
     metric: Literal["ttft", "tpot", "latency", "rps", "throughput"]
-    target: float
+    # gt=0 rejects nonsense targets before they reach the diff/target
+    # division in calculate_score.
+    target: float = Field(gt=0)
 
 class RecommendationRequest(BaseModel):
     group_id: str
@@ -28,18 +50,15 @@ class DetailedRecommendationResponse(BaseModel):
     cost_efficient: Optional[TestResult]
 
 def calculate_score(target: float, actual: float, gpu_cost: int, is_paid_engine: bool, metric: str) -> float:
-    if metric in ["ttft", "tpot", "latency"]:
-        # For these metrics, lower is better
-        relative_diff = (actual - target) / target
+    relative_diff = (actual - target) / target
+    if metric in _LOWER_IS_BETTER:
         if relative_diff <= 0:
             # Exceeded target (actual is lower), higher score for being closer to target
             performance_score = 1 + abs(relative_diff)
         else:
             # Did not meet target, lower score
             performance_score = 1 / (1 + relative_diff)
-    else:  # "rps", "throughput"
-        # For these metrics, higher is better
-        relative_diff = (actual - target) / target
+    else:  # "rps", "throughput": higher is better
         if relative_diff >= 0:
             # Exceeded target, higher score for being further above target
             performance_score = 1 + relative_diff
@@ -54,33 +73,141 @@ def calculate_score(target: float, actual: float, gpu_cost: int, is_paid_engine:
     engine_score = 0 if is_paid_engine else 0.2
     
     # Weighted sum of scores
-    total_score = performance_score * 0.5 + cost_score * 0.3 + engine_score * 0.2
-    
-    logging.info(f"Scores - Performance: {performance_score:.2f}, Cost: {cost_score:.2f}, Engine: {engine_score:.2f}, Total: {total_score:.2f}")
-    
-    return total_score
+    return performance_score * 0.5 + cost_score * 0.3 + engine_score * 0.2
+
+def calculate_score_vec(target: float, actuals: np.ndarray, gpu_costs: np.ndarray, is_paid: np.ndarray, metric: str) -> np.ndarray:
+    """calculate_score over aligned per-test arrays.
+
+    One ufunc pass per term instead of a branchy Python call per test;
+    the piecewise formula matches the scalar version exactly.
+    """
+    relative_diff = (actuals - target) / target
+    with np.errstate(divide='ignore'):
+        if metric in _LOWER_IS_BETTER:
+            performance_score = np.where(relative_diff <= 0, 1 + np.abs(relative_diff), 1 / (1 + relative_diff))
+        else:
+            performance_score = np.where(relative_diff >= 0, 1 + relative_diff, 1 / (1 - relative_diff))
+    performance_score = np.clip(performance_score / 2, 0, 1)
+    cost_score = 1 / (gpu_costs + 1)
+    engine_score = np.where(is_paid, 0.0, 0.2)
+    return performance_score * 0.5 + cost_score * 0.3 + engine_score * 0.2
+
+@dataclass(slots=True)
+class _ScoredTest:
+    """Per-test scalars captured once during validation, so scoring
+    touches fixed-offset attributes instead of repeated dict lookups."""
+    id: str
+    actual: float
+    gpu_cost: int
+    is_paid: bool
+
+def _collect_valid_tests(group_results: List[Dict], hw_map: Dict[str, Dict], metric: str) -> List[_ScoredTest]:
+    """Single validation pass: keep tests that have a result, hardware
+    info, and the requested metric, capturing the scalars scoring needs."""
+    valid = []
+    for test in group_results:
+        test_id = test['id']
+        if not test['result']:
+            logger.warning("No result found for test: %s", test_id)
+            continue
+        hardware_info = hw_map.get(test_id)
+        if not hardware_info:
+            logger.warning("No hardware info found for test: %s", test_id)
+            continue
+        try:
+            actual_value = get_metric_value(test['result'], metric)
+        except KeyError as e:
+            logger.warning("Missing metric %s for test %s: %s", metric, test_id, e)
+            continue
+        # %-style args defer the formatting until a handler actually
+        # wants the record; this fires once per test.
+        logger.debug("Processing test: %s metric=%.4f", test_id, actual_value)
+        valid.append(_ScoredTest(
+            id=test_id,
+            actual=actual_value,
+            gpu_cost=hardware_info['gpu_cost'],
+            is_paid=is_paid_engine(test['config']['endpoint_type']),
+        ))
+    return valid
+
+def _pick_recommendations(tests: List[_ScoredTest], target: float, metric: str) -> Dict[str, Optional[str]]:
+    """Pick the four category winners over the validated tests.
+
+    Larger groups go through the vectorized scorer and argmax/argmin;
+    for two tests the array setup costs more than it saves, so a scalar
+    loop handles that case.
+    """
+    higher_is_better = metric in ("rps", "throughput")
+
+    if len(tests) <= 2:
+        recommendations = {
+            "most_recommended": None,
+            "resource_efficient": None,
+            "performance_priority": None,
+            "cost_efficient": None
+        }
+        best_score = float('-inf')
+        best_performance = float('-inf') if higher_is_better else float('inf')
+        best_resource_efficiency = float('-inf')
+        best_cost_efficiency = float('-inf')
+        for t in tests:
+            base_score = calculate_score(target, t.actual, t.gpu_cost, False, metric)
+            if t.is_paid:
+                score = calculate_score(target, t.actual, t.gpu_cost, True, metric)
+            else:
+                score = base_score
+            if score > best_score:
+                best_score = score
+                recommendations["most_recommended"] = t.id
+            if (t.actual > best_performance) if higher_is_better else (t.actual < best_performance):
+                best_performance = t.actual
+                recommendations["performance_priority"] = t.id
+            if base_score > best_resource_efficiency:
+                best_resource_efficiency = base_score
+                recommendations["resource_efficient"] = t.id
+            if not t.is_paid and base_score > best_cost_efficiency:
+                best_cost_efficiency = base_score
+                recommendations["cost_efficient"] = t.id
+        return recommendations
+
+    n = len(tests)
+    actuals_arr = np.fromiter((t.actual for t in tests), dtype=np.float64, count=n)
+    costs_arr = np.fromiter((t.gpu_cost for t in tests), dtype=np.float64, count=n)
+    paid_arr = np.fromiter((t.is_paid for t in tests), dtype=bool, count=n)
+
+    base_scores = calculate_score_vec(target, actuals_arr, costs_arr, np.zeros(n, dtype=bool), metric)
+    overall_scores = calculate_score_vec(target, actuals_arr, costs_arr, paid_arr, metric)
+
+    # argmax/argmin keep the first maximum, matching the strict ">"
+    # comparisons of the scalar loop.
+    recommendations = {
+        "most_recommended": tests[int(np.argmax(overall_scores))].id,
+        "resource_efficient": tests[int(np.argmax(base_scores))].id,
+        "performance_priority": tests[int(np.argmax(actuals_arr) if higher_is_better else np.argmin(actuals_arr))].id,
+        "cost_efficient": None
+    }
+    unpaid = ~paid_arr
+    if unpaid.any():
+        recommendations["cost_efficient"] = tests[int(np.argmax(np.where(unpaid, base_scores, -np.inf)))].id
+    return recommendations
 
 def is_paid_engine(endpoint_type: str) -> bool:
-    return endpoint_type in ["openai", "friendliai"]  # Add other paid engines as needed
+    return endpoint_type in _PAID_ENGINES
 
 def get_metric_value(result: Dict, metric: str) -> float:
-    if metric == "ttft":
-        return result['TTFT']['avg']
-    elif metric == "tpot":
-        return result['TPOT']['avg']
-    elif metric == "latency":
-        return result['latency']['avg']
-    elif metric == "rps":
-        return result['RPS']
-    elif metric == "throughput":
-        return result['Throughput']['avg']
-    else:
+    accessor = _METRIC_ACCESSORS.get(metric)
+    if accessor is None:
         raise ValueError(f"Unknown metric: {metric}")
-    
-def get_test_result(test_id: str, group_results: List[Dict]) -> TestResult:
+    try:
+        return accessor(result)
+    except KeyError as e:
+        logger.error("Failed to get metric value: %s", e)
+        raise
+
+def get_test_result(test_id: str, group_results: List[Dict], hw_map: Dict[str, Dict]) -> TestResult:
     for test in group_results:
         if test['id'] == test_id:
-            hardware_info = get_hardware_info_with_cost(test_id)
+            hardware_info = hw_map.get(test_id)
             return TestResult(
                 id=test['id'],
                 config=test['config'],
@@ -93,137 +220,103 @@ def get_test_result(test_id: str, group_results: List[Dict]) -> TestResult:
             )
     raise ValueError(f"Test result not found for test_id: {test_id}")
     
+# Recommendations are a pure function of the stored group results and
+# the request parameters, so repeat calls within the TTL skip the DB
+# queries and scoring entirely; 60s bounds how stale a recommendation
+# can be after a test in the group finishes.
+_RECO_TTL = 60.0
+_RECO_CACHE_MAX = 1024
+_reco_cache: Dict[tuple, tuple] = {}  # (group_id, metric, target) -> (expires_at, response)
+
+def _reco_cache_get(key: tuple) -> Optional[RecommendationResponse]:
+    entry = _reco_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _reco_cache_put(key: tuple, response: RecommendationResponse) -> None:
+    if len(_reco_cache) >= _RECO_CACHE_MAX:
+        now = time.monotonic()
+        for stale in [k for k, (expires_at, _) in _reco_cache.items() if expires_at <= now]:
+            del _reco_cache[stale]
+        if len(_reco_cache) >= _RECO_CACHE_MAX:
+            _reco_cache.clear()
+    _reco_cache[key] = (time.monotonic() + _RECO_TTL, response)
+
 @router.post("/recommend", response_model=RecommendationResponse)
 async def recommend_servers(request: RecommendationRequest):
-    logging.info(f"Received recommendation request for group: {request.group_id}")
+    metric = request.performance_metric.metric
+    target = request.performance_metric.target
+    cache_key = (request.group_id, metric, target)
+    cached = _reco_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    logger.info("Received recommendation request for group: %s", request.group_id)
     group_results = db_get_group_test_results(request.group_id)
-    
+
     if not group_results:
-        logging.warning(f"No results found for group '{request.group_id}'")
+        logger.warning("No results found for group '%s'", request.group_id)
         raise HTTPException(status_code=404, detail=f"No results found for group '{request.group_id}'")
 
-    logging.info(f"Found {len(group_results)} tests in the group")
+    logger.info("Found %d tests in the group", len(group_results))
 
-    valid_tests = []
-    for test in group_results:
-        test_id = test['id']
-        if not test['result']:
-            logging.warning(f"No result found for test: {test_id}")
-            continue
-        if not get_hardware_info_with_cost(test_id):
-            logging.warning(f"No hardware info found for test: {test_id}")
-            continue
-        valid_tests.append(test_id)
+    # One IN query for every test's hardware info; the validation pass
+    # below looks ids up in this map.
+    hw_map = db_get_hardware_info_with_cost_bulk([test['id'] for test in group_results])
+
+    valid_tests = _collect_valid_tests(group_results, hw_map, metric)
 
     if not valid_tests:
-        logging.error("No valid tests found in the group")
+        logger.error("No valid tests found in the group")
         raise HTTPException(status_code=404, detail="No valid tests found in the group")
 
     if len(valid_tests) == 1:
-        single_test_id = valid_tests[0]
-        logging.info(f"Only one valid test found: {single_test_id}. Using it for all recommendations.")
-        return RecommendationResponse(
+        single_test_id = valid_tests[0].id
+        logger.info("Only one valid test found: %s. Using it for all recommendations.", single_test_id)
+        response = RecommendationResponse(
             most_recommended=single_test_id,
             resource_efficient=single_test_id,
             performance_priority=single_test_id,
             cost_efficient=single_test_id
         )
+        _reco_cache_put(cache_key, response)
+        return response
 
-    recommendations = {
-        "most_recommended": None,
-        "resource_efficient": None,
-        "performance_priority": None,
-        "cost_efficient": None
-    }
-
-    best_score = float('-inf')
-    best_performance = float('-inf') if request.performance_metric.metric in ["rps", "throughput"] else float('inf')
-    best_resource_efficiency = float('-inf')
-    best_cost_efficiency = float('-inf')
-
-    for test in group_results:
-        test_id = test['id']
-        if test_id not in valid_tests:
-            continue
-
-        config = test['config']
-        result = test['result']
-        hardware_info = get_hardware_info_with_cost(test_id)
-        
-        try:
-            actual_value = get_metric_value(result, request.performance_metric.metric)
-        except KeyError as e:
-            logging.warning(f"Missing metric {request.performance_metric.metric} for test {test_id}: {e}")
-            continue
-
-        logging.info(f"Processing test: {test_id}. Metric value: {actual_value}")
-
-        gpu_cost = hardware_info['gpu_cost']
-        is_paid = is_paid_engine(config['endpoint_type'])
-
-        # Most recommended
-        score = calculate_score(request.performance_metric.target, actual_value, gpu_cost, is_paid, request.performance_metric.metric)
-        if score > best_score:
-            best_score = score
-            recommendations["most_recommended"] = test_id
-
-        # Performance priority
-        if request.performance_metric.metric in ["rps", "throughput"]:
-            if actual_value > best_performance:
-                best_performance = actual_value
-                recommendations["performance_priority"] = test_id
-        else:
-            if actual_value < best_performance:
-                best_performance = actual_value
-                recommendations["performance_priority"] = test_id
-
-        # Resource efficiency
-        resource_efficiency = calculate_score(request.performance_metric.target, actual_value, gpu_cost, False, request.performance_metric.metric)
-        if resource_efficiency > best_resource_efficiency:
-            best_resource_efficiency = resource_efficiency
-            recommendations["resource_efficient"] = test_id
-
-        # Cost efficiency (only for non-paid engines)
-        if not is_paid:
-            cost_efficiency = calculate_score(request.performance_metric.target, actual_value, gpu_cost, False, request.performance_metric.metric)
-            if cost_efficiency > best_cost_efficiency:
-                best_cost_efficiency = cost_efficiency
-                recommendations["cost_efficient"] = test_id
+    recommendations = _pick_recommendations(valid_tests, target, metric)
 
-    logging.info(f"Recommendations: {recommendations}")
+    logger.info("Recommendations: %s", recommendations)
 
-    return RecommendationResponse(**recommendations)
+    response = RecommendationResponse(**recommendations)
+    _reco_cache_put(cache_key, response)
+    return response
 
 @router.post("/detailed_recommend", response_model=DetailedRecommendationResponse)
 async def detailed_recommend_servers(request: RecommendationRequest):
-    logging.info(f"Received detailed recommendation request for group: {request.group_id}")
+    metric = request.performance_metric.metric
+    target = request.performance_metric.target
+    logger.info("Received detailed recommendation request for group: %s", request.group_id)
     group_results = db_get_group_test_results(request.group_id)
-    
+
     if not group_results:
-        logging.warning(f"No results found for group '{request.group_id}'")
+        logger.warning("No results found for group '%s'", request.group_id)
         raise HTTPException(status_code=404, detail=f"No results found for group '{request.group_id}'")
 
-    logging.info(f"Found {len(group_results)} tests in the group")
+    logger.info("Found %d tests in the group", len(group_results))
 
-    valid_tests = []
-    for test in group_results:
-        test_id = test['id']
-        if not test['result']:
-            logging.warning(f"No result found for test: {test_id}")
-            continue
-        if not get_hardware_info_with_cost(test_id):
-            logging.warning(f"No hardware info found for test: {test_id}")
-            continue
-        valid_tests.append(test_id)
+    # One IN query for every test's hardware info; the validation pass
+    # below looks ids up in this map.
+    hw_map = db_get_hardware_info_with_cost_bulk([test['id'] for test in group_results])
+
+    valid_tests = _collect_valid_tests(group_results, hw_map, metric)
 
     if not valid_tests:
-        logging.error("No valid tests found in the group")
+        logger.error("No valid tests found in the group")
         raise HTTPException(status_code=404, detail="No valid tests found in the group")
 
     if len(valid_tests) == 1:
-        single_test_id = valid_tests[0]
-        logging.info(f"Only one valid test found: {single_test_id}. Using it for all recommendations.")
-        single_test_result = get_test_result(single_test_id, group_results)
+        single_test_id = valid_tests[0].id
+        logger.info("Only one valid test found: %s. Using it for all recommendations.", single_test_id)
+        single_test_result = get_test_result(single_test_id, group_results, hw_map)
         return DetailedRecommendationResponse(
             most_recommended=single_test_result,
             resource_efficient=single_test_result,
@@ -231,94 +324,14 @@ async def detailed_recommend_servers(request: RecommendationRequest):
             cost_efficient=single_test_result
         )
 
-    recommendations = {
-        "most_recommended": None,
-        "resource_efficient": None,
-        "performance_priority": None,
-        "cost_efficient": None
-    }
-
-    best_score = float('-inf')
-    best_performance = float('-inf') if request.performance_metric.metric in ["rps", "throughput"] else float('inf')
-    best_resource_efficiency = float('-inf')
-    best_cost_efficiency = float('-inf')
-
-    for test in group_results:
-        test_id = test['id']
-        if test_id not in valid_tests:
-            continue
-
-        config = test['config']
-        result = test['result']
-        hardware_info = get_hardware_info_with_cost(test_id)
-        
-        try:
-            actual_value = get_metric_value(result, request.performance_metric.metric)
-        except KeyError as e:
-            logging.warning(f"Missing metric {request.performance_metric.metric} for test {test_id}: {e}")
-            continue
-
-        logging.info(f"Processing test: {test_id}. Metric value: {actual_value}")
+    recommendations = _pick_recommendations(valid_tests, target, metric)
 
-        gpu_cost = hardware_info['gpu_cost']
-        is_paid = is_paid_engine(config['endpoint_type'])
+    logger.info("Recommendations: %s", recommendations)
 
-        # Most recommended
-        score = calculate_score(request.performance_metric.target, actual_value, gpu_cost, is_paid, request.performance_metric.metric)
-        if score > best_score:
-            best_score = score
-            recommendations["most_recommended"] = test_id
-
-        # Performance priority
-        if request.performance_metric.metric in ["rps", "throughput"]:
-            if actual_value > best_performance:
-                best_performance = actual_value
-                recommendations["performance_priority"] = test_id
-        else:
-            if actual_value < best_performance:
-                best_performance = actual_value
-                recommendations["performance_priority"] = test_id
-
-        # Resource efficiency
-        resource_efficiency = calculate_score(request.performance_metric.target, actual_value, gpu_cost, False, request.performance_metric.metric)
-        if resource_efficiency > best_resource_efficiency:
-            best_resource_efficiency = resource_efficiency
-            recommendations["resource_efficient"] = test_id
-
-        # Cost efficiency (only for non-paid engines)
-        if not is_paid:
-            cost_efficiency = calculate_score(request.performance_metric.target, actual_value, gpu_cost, False, request.performance_metric.metric)
-            if cost_efficiency > best_cost_efficiency:
-                best_cost_efficiency = cost_efficiency
-                recommendations["cost_efficient"] = test_id
-
-    logging.info(f"Recommendations: {recommendations}")
-
-   # Convert recommendations to TestResult objects
-    detailed_recommendations = {}
-    for key, test_id in recommendations.items():
-        if test_id:
-            detailed_recommendations[key] = get_test_result(test_id, group_results)
-        else:
-            detailed_recommendations[key] = None
+    # Convert recommendations to TestResult objects
+    detailed_recommendations = {
+        key: get_test_result(test_id, group_results, hw_map) if test_id else None
+        for key, test_id in recommendations.items()
+    }
 
     return DetailedRecommendationResponse(**detailed_recommendations)
-
-def get_metric_value(result: Dict, metric: str) -> float:
-    try:
-        if metric == "ttft":
-            return result['TTFT']['avg']
-        elif metric == "tpot":
-            return result['TPOT']['avg']
-        elif metric == "latency":
-            return result['latency']['avg']
-        elif metric == "rps":
-            return result['RPS']
-        elif metric == "throughput":
-            return result['Throughput']['avg']
-        else:
-            raise ValueError(f"Unknown metric: {metric}")
-    except KeyError as e:
-        logging.error(f"Failed to get metric value: {e}")
-        raise
-    
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Body
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, validator
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Literal, List, Dict
 from .protocols import TestConfig
 from .db import (
@@ -13,26 +13,89 @@ from .db import (
     get_id_list,
     set_nickname,
     delete_test,
+    delete_tests_bulk,
     add_hardware_info,
     get_hardware_info_with_cost
 )
+import asyncio
+import io
 import os
-import glob
 import zipfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Computed once; point INFERNO_TMP at a tmpfs mount to take disk I/O out
+# of the report endpoints entirely.
+TMP = Path(os.environ.get("INFERNO_TMP", "tmp"))
+
+# Built once instead of a fresh list literal (and O(n) scan) per
+# verify_config call.
+_SUPPORTED_ENDPOINTS = frozenset(("tgi", "vllm", "friendliai", "triton", "openai"))
+_SUPPORTED_DATASETS = frozenset(("arena", "oasst1", "synthesizer", "dolly", "openorca"))
 
 class HardwareInfo(BaseModel):
     gpu_model: Literal['A100', 'A10', 'A30', 'A40', 'H100', 'H200']
-    gpu_count: int
-
-    @validator('gpu_count')
-    def validate_gpu_count(cls, v):
-        if v <= 0:
-            raise ValueError('GPU count must be positive')
-        return v
+    # Field(gt=0) runs in pydantic-core, replacing the legacy v1
+    # @validator that went through the compatibility shim and a Python
+    # callback per request.
+    gpu_count: int = Field(gt=0)
 
 router = APIRouter(prefix="/tests", tags=["tests"])
 
+def _test_artifacts(test_id: str) -> List[str]:
+    """Report artifacts for one test (the old ``tmp/*_{id}.*`` glob).
+
+    One os.scandir pass with string checks instead of a listdir+fnmatch
+    per glob pattern; the worker process writes these files out-of-band,
+    so the directory is re-read rather than indexed in memory.
+    """
+    suffix = "_" + test_id
+    paths = []
+    try:
+        with os.scandir(TMP) as entries:
+            for entry in entries:
+                stem, dot, _ext = entry.name.rpartition(".")
+                if dot and stem.endswith(suffix):
+                    paths.append(entry.path)
+    except FileNotFoundError:
+        pass
+    return paths
+
+def _remove_files(paths: List[str]) -> List[str]:
+    """Unlink paths, fanning out over a thread pool for large batches.
+
+    Each unlink is a blocking syscall; deleting thousands of artifacts
+    serially dominates delete_all wall time on slow storage.
+    """
+    def _rm(path):
+        try:
+            os.remove(path)
+            return path
+        except OSError as e:
+            logging.error(f"Error deleting file {path}: {e}")
+            return None
+
+    if len(paths) <= 4:
+        return [p for p in map(_rm, paths) if p is not None]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        return [p for p in pool.map(_rm, paths) if p is not None]
+
+def _all_artifacts() -> List[str]:
+    """Every report artifact in tmp/, in one directory pass."""
+    paths = []
+    try:
+        with os.scandir(TMP) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".zip") or (
+                    "_" in name and name.endswith((".png", ".json", ".pkl", ".txt"))
+                ):
+                    paths.append(entry.path)
+    except FileNotFoundError:
+        pass
+    return paths
+
 @router.post("/register")
 def register(config: TestConfig):
     """
@@ -134,22 +197,13 @@ def delete_test_by_test_id(test_id: str):
     ```
     """
     delete_test(test_id)
-    
-    file_patterns = [
-        f"tmp/*_{test_id}.*",
-        f"tmp/{test_id}.zip",
-        f"tmp/workload_hash_{test_id}.txt"
-    ]
-    
-    deleted_files = []
-    for pattern in file_patterns:
-        files = glob.glob(pattern)
-        for file in files:
-            try:
-                os.remove(file)
-                deleted_files.append(file)
-            except OSError as e:
-                logging.error(f"Error deleting file {file}: {e}")
+
+    files = _test_artifacts(test_id)
+    zip_path = TMP / f"{test_id}.zip"
+    if zip_path.exists():
+        files.append(str(zip_path))
+
+    deleted_files = _remove_files(files)
     
     if deleted_files:
         logging.info(f"Deleted files associated with test {test_id}: {', '.join(deleted_files)}")
@@ -157,7 +211,7 @@ def delete_test_by_test_id(test_id: str):
     return {"deleted_files": deleted_files, "message": f"Test {test_id} and associated files deleted successfully"}
 
 @router.get("/delete_all")
-def delete_all_tests():
+async def delete_all_tests():
     """
     Delete all tests and their associated files.
 
@@ -169,35 +223,19 @@ def delete_all_tests():
     GET /tests/delete_all
     ```
     """
-    ids = get_id_list()
+    ids = await asyncio.to_thread(get_id_list)
     deleted_ids = []
     errors = []
-    deleted_files = []
-    
-    file_patterns = [
-        "tmp/*_*.png",
-        "tmp/*_*.json",
-        "tmp/*.zip",
-        "tmp/*_*.pkl",
-        "tmp/workload_hash_*.txt"
-    ]
-    
-    for pattern in file_patterns:
-        files = glob.glob(pattern)
-        for file in files:
-            try:
-                os.remove(file)
-                deleted_files.append(file)
-            except OSError as e:
-                logging.error(f"Error deleting file {file}: {e}")
-    
-    for id_info in ids:
-        test_id = id_info[0]
-        try:
-            delete_test(test_id)
-            deleted_ids.append(test_id)
-        except Exception as e:
-            errors.append((test_id, str(e)))
+    # The directory scan and the fan-out unlinks are blocking syscalls;
+    # run them on a worker thread so the event loop keeps serving.
+    deleted_files = await asyncio.to_thread(lambda: _remove_files(_all_artifacts()))
+
+    test_ids = [id_info[0] for id_info in ids]
+    try:
+        await asyncio.to_thread(delete_tests_bulk, test_ids)
+        deleted_ids = test_ids
+    except Exception as e:
+        errors.append((test_ids, str(e)))
     
     if deleted_files:
         logging.info(f"Deleted files: {', '.join(deleted_files)}")
@@ -295,11 +333,11 @@ def get_workload_hash(test_id: str):
     GET /tests/workload_hash/test_001
     ```
     """
-    if not os.path.exists("tmp/workload_hash_" + test_id + ".txt"):
+    path = TMP / f"workload_hash_{test_id}.txt"
+    if not path.exists():
         raise HTTPException(status_code=404, detail="Workload hash not found")
     else:
-        with open("tmp/workload_hash_" + test_id + ".txt", mode="r") as f:
-            return f.read()
+        return FileResponse(path, media_type="text/plain")
 
 @router.get("/report/throughput/{test_id}")
 def report_throughput(test_id: str):
@@ -316,11 +354,13 @@ def report_throughput(test_id: str):
     GET /tests/report/throughput/test_001
     ```
     """
-    if not os.path.exists("tmp/tp_" + test_id + ".png"):
+    path = TMP / f"tp_{test_id}.png"
+    if not path.exists():
         raise HTTPException(status_code=404, detail="Report not found")
     else:
-        file_like = open("tmp/tp_" + test_id + ".png", mode="rb")
-        return StreamingResponse(file_like, media_type="image/png")
+        # FileResponse takes Starlette's sendfile fast path: the kernel
+        # moves bytes disk->socket and the fd is closed for us.
+        return FileResponse(path, media_type="image/png")
 
 @router.get("/report/requests_status/{test_id}")
 def report_requests_status(test_id: str):
@@ -337,11 +377,11 @@ def report_requests_status(test_id: str):
     GET /tests/report/requests_status/test_001
     ```
     """
-    if not os.path.exists("tmp/rs_" + test_id + ".png"):
+    path = TMP / f"rs_{test_id}.png"
+    if not path.exists():
         raise HTTPException(status_code=404, detail="Report not found")
     else:
-        file_like = open("tmp/rs_" + test_id + ".png", mode="rb")
-        return StreamingResponse(file_like, media_type="image/png")
+        return FileResponse(path, media_type="image/png")
 
 @router.get("/report/json/{test_id}")
 def report_json(test_id: str):
@@ -358,11 +398,11 @@ def report_json(test_id: str):
     GET /tests/report/json/test_001
     ```
     """
-    if not os.path.exists("tmp/report_" + test_id + ".json"):
+    path = TMP / f"report_{test_id}.json"
+    if not path.exists():
         raise HTTPException(status_code=404, detail="Report not found")
     else:
-        file_like = open("tmp/report_" + test_id + ".json", mode="r")
-        return StreamingResponse(file_like, media_type="application/json")
+        return FileResponse(path, media_type="application/json")
 
 @router.get("/report/download/{test_id}")
 def download_report(test_id: str):
@@ -379,17 +419,37 @@ def download_report(test_id: str):
     GET /tests/report/download/test_001
     ```
     """
-    file_paths = glob.glob("tmp/*_" + test_id + ".*")
+    file_paths = _test_artifacts(test_id)
     if len(file_paths) == 0:
         raise HTTPException(status_code=404, detail="Report not found")
     else:
-        zip_filename = f"tmp/{test_id}.zip"
-        with zipfile.ZipFile(zip_filename, "w") as zipf:
+        zip_filename = TMP / f"{test_id}.zip"
+        # Repeat downloads of an unchanged report reuse the cached zip.
+        newest = max(os.path.getmtime(f) for f in file_paths)
+        if zip_filename.exists() and zip_filename.stat().st_mtime >= newest:
+            return FileResponse(
+                zip_filename,
+                media_type="application/zip",
+                filename=f"{test_id}.zip",
+            )
+        # First build goes through an in-memory buffer: the response
+        # streams the bytes we just assembled instead of re-reading them
+        # from disk, and one write_bytes persists the cache for next
+        # time. Deflate only the text members -- the PNGs are already
+        # compressed and re-deflating them just burns CPU.
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as zipf:
             for file in file_paths:
-                zipf.write(file, arcname=os.path.basename(file))
-        file_like = open(zip_filename, mode="rb")
+                compress = (
+                    zipfile.ZIP_DEFLATED
+                    if file.endswith((".json", ".txt"))
+                    else zipfile.ZIP_STORED
+                )
+                zipf.write(file, arcname=os.path.basename(file), compress_type=compress)
+        zip_filename.write_bytes(buf.getvalue())
+        buf.seek(0)
         return StreamingResponse(
-            file_like,
+            buf,
             media_type="application/zip",
             headers={"Content-Disposition": f'attachment; filename="{test_id}.zip"'},
         )
@@ -471,10 +531,10 @@ def verify_config(config: TestConfig) -> tuple[bool, str]:
     if not config.model:
         return False, "Model must be specified"
     
-    if config.endpoint_type not in ["tgi", "vllm", "friendliai", "triton", "openai"]:
+    if config.endpoint_type not in _SUPPORTED_ENDPOINTS:
         return False, f"Unsupported endpoint type: {config.endpoint_type}"
-    
-    if config.dataset_name not in ["arena", "oasst1", "synthesizer", "dolly", "openorca"]:
+
+    if config.dataset_name not in _SUPPORTED_DATASETS:
         return False, f"Unsupported dataset name: {config.dataset_name}"
     
     return True, ""
\ No newline at end of file
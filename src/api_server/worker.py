@@ -77,19 +77,15 @@ def run_with_config(id: str, config: TestConfig):
                 workload, config.endpoint_type, id, **run_config
             )
         )
-        pickle.dump(
-            raw_result,
-            open(f"tmp/responses_{id}.pkl", "wb"),
-        )
+        with open(f"tmp/responses_{id}.pkl", "wb") as f:
+            pickle.dump(raw_result, f)
         with open(f"tmp/workload_hash_{id}.txt", "w") as f:
             f.write(workload_hash)
         responses: List[ReqResponse] = sum([v.responses for v in raw_result], [])
         logging.info("start generate reports")
         report = generate_request_level_report(responses, config.get_model_full_name(), hf_auth_key=hf_auth_key)
-        pickle.dump(
-            report,
-            open(f"tmp/raw_report_{id}.pkl", "wb"),
-        )
+        with open(f"tmp/raw_report_{id}.pkl", "wb") as f:
+            pickle.dump(report, f)
         with open(f"tmp/report_{id}.json", "w") as f:
             json.dump(report.show_as_dict(), f, indent=4)
         RequestsStatus(responses, f"tmp/rs_{id}.png")
@@ -111,12 +107,9 @@ if __name__ == "__main__":
     logging.info(f"Worker started on {worker_id}")
     threads: List[threading.Thread] = []
     while True:
-        pending_tests = get_all_pending_tests()
-        if len(pending_tests) == 0:
-            update_worker_heartbeat(worker_id=worker_id, timestamp=time.time())
-            time.sleep(1)
-            continue
-        for id, config in pending_tests:
+        found_pending = False
+        for id, config in get_all_pending_tests():
+            found_pending = True
             logging.info(
                 f"{worker_id} Found pending test {id}, endpoint: {config.url}, model: {config.model}"
             )
@@ -125,3 +118,6 @@ if __name__ == "__main__":
             t = threading.Thread(target=run_with_config, args=(id, config))
             t.start()
             threads.append(t)
+        if not found_pending:
+            update_worker_heartbeat(worker_id=worker_id, timestamp=time.time())
+            time.sleep(1)
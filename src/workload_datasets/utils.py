@@ -101,25 +101,34 @@ def filter_workload_length(min_length: int = 0, max_length: int = float('inf')):
 
 def load_local_dataset(dataset_name: str) -> Any:
     """
-    Load a dataset from a local pickle file.
-    
+    Load a dataset saved locally by datasets_download.py.
+
+    Datasets are stored on disk in Arrow format and memory-mapped on load,
+    so this is O(1) at startup. Legacy pickle files are still read as a
+    fallback for data downloaded before the Arrow switch.
+
     Args:
         dataset_name (str): Name of the dataset (e.g., 'arena', 'oasst1', 'dolly', 'openorca')
-    
+
     Returns:
         Any: The loaded dataset
-    
+
     Raises:
-        FileNotFoundError: If the dataset file is not found
+        FileNotFoundError: If the dataset is not found
     """
-    import pickle
     import os
-    file_path = os.path.join('src', 'data', f'{dataset_name}_dataset.pkl')
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Dataset file not found: {file_path}")
-    
-    with open(file_path, 'rb') as f:
-        return pickle.load(f)
+    arrow_path = os.path.join('src', 'data', f'{dataset_name}_dataset')
+    if os.path.exists(arrow_path):
+        from datasets import load_from_disk
+        return load_from_disk(arrow_path)
+
+    legacy_path = f'{arrow_path}.pkl'
+    if os.path.exists(legacy_path):
+        import pickle
+        with open(legacy_path, 'rb') as f:
+            return pickle.load(f)
+
+    raise FileNotFoundError(f"Dataset not found: {arrow_path}")
 
 
 if __name__ == "__main__":